@@ -10,6 +10,9 @@ from excel_formula_formatter.syntax_translator_base import SyntaxTranslatorBase
 class CompactExcelTranslator(SyntaxTranslatorBase):
     """Compact Excel translator - pure Excel syntax with minimal spacing for maximum efficiency."""
     
+    mode_code = 'c'
+    reverse_is_identity = True
+    
     def get_language_name(self) -> str:
         return "Excel (Compact)"
     
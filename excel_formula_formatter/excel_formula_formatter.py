@@ -6,19 +6,46 @@ File: excel_formula_formatter/excel_formula_formatter.py
 """
 
 import sys
-import re
 
 from excel_formula_formatter.excel_formula_patterns import (
-    cell_ref_all_rgx, excel_functions_rgx, string_literal_rgx, 
+    cell_ref_all_rgx, excel_functions_rgx, excel_function_names, string_literal_rgx, 
     number_rgx, excel_not_equal_rgx, js_not_equal_rgx,
-    comment_line_rgx, inline_comment_rgx, whitespace_newline_rgx,
-    leading_trailing_space_rgx
+    comment_line_rgx, inline_comment_rgx, string_literal_token_rgx, string_literal_split_rgx,
+    operator_adjacent_space_rgx, space_cleanup_whitespace_rgx
 )
 
 
+# Character classes for the tokenizer (set membership instead of string scans)
+two_char_operators = frozenset(['<>', '>=', '<='])
+single_char_tokens = frozenset('+-*/=<>(),[]:;!&%^')
+word_terminators = single_char_tokens | {'"'}
+comparison_operators = frozenset(['<>', '>=', '<=', '==', '!='])
+
+# Descriptive comments for common Excel functions, keyed by upper-case name
+function_comments = {
+    'SUM': 'Sum values',
+    'IF': 'Conditional logic',
+    'VLOOKUP': 'Vertical lookup',
+    'HLOOKUP': 'Horizontal lookup',
+    'INDEX': 'Index lookup',
+    'MATCH': 'Find position',
+    'SUMIF': 'Conditional sum',
+    'SUMIFS': 'Multiple criteria sum',
+    'COUNTIF': 'Conditional count',
+    'COUNTIFS': 'Multiple criteria count',
+    'CONCATENATE': 'Text concatenation',
+    'LET': 'Variable assignments',
+    'AND': 'Logical AND',
+    'OR': 'Logical OR',
+    'NOT': 'Logical NOT',
+    'IFS': 'Multiple conditions'
+}
+
+
 class ExcelFormulaFormatter:
     def __init__(self, indent_size: int = 4):
         self.indent_size = indent_size
+        self._indent_cache = [""]  # Indent strings by depth
         
     def fold_formula(self, formula: str) -> str:
         """Transform Excel formula to JavaScript-like syntax with indentation."""
@@ -67,9 +94,8 @@ class ExcelFormulaFormatter:
         no_comments = comment_line_rgx.sub('', js_like_text)
         no_comments = inline_comment_rgx.sub('', no_comments)
         
-        # Flatten to single line
-        single_line = whitespace_newline_rgx.sub(' ', no_comments)
-        single_line = leading_trailing_space_rgx.sub('', single_line)
+        # Flatten to single line (split() drops edge whitespace and collapses runs)
+        single_line = ' '.join(no_comments.split())
         
         if not single_line:
             return ""
@@ -101,12 +127,9 @@ class ExcelFormulaFormatter:
                 
             # Check for string literals first (quoted text)
             if formula[i] == '"':
-                end_quote = formula.find('"', i + 1)
-                if end_quote == -1:
-                    end_quote = length  # Unclosed quote, take rest
-                token_text = formula[i:end_quote + 1]
-                tokens.append(('string', token_text))
-                i = end_quote + 1
+                string_match = string_literal_token_rgx.match(formula, i)
+                tokens.append(('string', string_match.group(0)))
+                i = string_match.end()
                 continue
             
             # Check for cell references (including ranges and sheet references)
@@ -120,20 +143,20 @@ class ExcelFormulaFormatter:
             # Check for two-character operators
             if i < length - 1:
                 two_char = formula[i:i+2]
-                if two_char in ['<>', '>=', '<=']:
+                if two_char in two_char_operators:
                     tokens.append(('operator', two_char))
                     i += 2
                     continue
             
             # Check for single character operators and punctuation
-            if formula[i] in '+-*/=<>(),[]:;!&%^':
+            if formula[i] in single_char_tokens:
                 tokens.append(('punctuation', formula[i]))
                 i += 1
                 continue
             
             # Collect word/number/identifier
             start = i
-            while i < length and not formula[i].isspace() and formula[i] not in '+-*/=<>(),[]:;!&%^"':
+            while i < length and not formula[i].isspace() and formula[i] not in word_terminators:
                 i += 1
             
             if start < i:
@@ -145,13 +168,18 @@ class ExcelFormulaFormatter:
     
     def _classify_token(self, token: str) -> str:
         """Classify a token by type."""
-        if excel_functions_rgx.match(token):
+        if token.isascii() and token.replace('_', 'A').isalnum():
+            # Plain ASCII word: set lookup is equivalent to the word-bounded regex
+            if token.upper() in excel_function_names:
+                return 'function'
+        elif excel_functions_rgx.match(token):
             return 'function'
-        elif cell_ref_all_rgx.match(token):
+        
+        if cell_ref_all_rgx.match(token):
             return 'cell_ref'
         elif number_rgx.match(token):
             return 'number'
-        elif token in ['<>', '>=', '<=', '==', '!=']:
+        elif token in comparison_operators:
             return 'operator'
         else:
             return 'identifier'
@@ -485,30 +513,15 @@ class ExcelFormulaFormatter:
             lines.append(self._indent(depth) + stripped)
     
     def _indent(self, depth: int) -> str:
-        """Generate indentation string."""
-        return " " * (depth * self.indent_size)
+        """Generate indentation string (built once per depth, then reused)."""
+        cache = self._indent_cache
+        while len(cache) <= depth:
+            cache.append(" " * (len(cache) * self.indent_size))
+        return cache[depth]
     
     def _get_function_comment(self, function_name: str) -> str:
         """Get descriptive comment for function."""
-        comments = {
-            'SUM': 'Sum values',
-            'IF': 'Conditional logic',
-            'VLOOKUP': 'Vertical lookup',
-            'HLOOKUP': 'Horizontal lookup',
-            'INDEX': 'Index lookup',
-            'MATCH': 'Find position',
-            'SUMIF': 'Conditional sum',
-            'SUMIFS': 'Multiple criteria sum',
-            'COUNTIF': 'Conditional count',
-            'COUNTIFS': 'Multiple criteria count',
-            'CONCATENATE': 'Text concatenation',
-            'LET': 'Variable assignments',
-            'AND': 'Logical AND',
-            'OR': 'Logical OR',
-            'NOT': 'Logical NOT',
-            'IFS': 'Multiple conditions'
-        }
-        return comments.get(function_name.upper(), '')
+        return function_comments.get(function_name.upper(), '')
     
     def _transform_js_to_excel(self, js_text: str) -> str:
         """Transform JavaScript-like syntax back to Excel."""
@@ -523,29 +536,20 @@ class ExcelFormulaFormatter:
                 return quoted_text  # Keep quotes if not a cell reference
         
         # Apply unquoting to quoted cell references
-        result = re.sub(r'"[^"]*"', unquote_cell_ref, js_text)
+        result = string_literal_rgx.sub(unquote_cell_ref, js_text)
         
         # Convert != back to <>
         result = js_not_equal_rgx.sub('<>', result)
         
-        # Temporarily replace string literals with placeholders
-        string_parts = []
-        def replace_string(match):
-            string_parts.append(match.group(0))
-            return f"__STRING_{len(string_parts)-1}__"
-        
-        result = re.sub(r'"[^"]*"', replace_string, result)
-        
-        # Clean up operators (avoiding the string placeholders)
-        result = re.sub(r'\s*([+\-*/=<>!,()])\s*', r'\1', result)
-        result = re.sub(r'\s*(<>|>=|<=)\s*', r'\1', result)
-        
-        # Restore string literals
-        for i, string_literal in enumerate(string_parts):
-            result = result.replace(f"__STRING_{i}__", string_literal)
+        # Clean up operators outside string literals; split() puts the literals at the
+        # odd indexes, so nothing has to be swapped out and restored one by one
+        parts = string_literal_split_rgx.split(result)
+        for i in range(0, len(parts), 2):
+            parts[i] = operator_adjacent_space_rgx.sub('', parts[i])
+        result = ''.join(parts)
         
         # Clean up any remaining multiple spaces
-        result = re.sub(r'\s+', ' ', result)
+        result = space_cleanup_whitespace_rgx.sub(' ', result)
         
         return result.strip()
 
@@ -571,7 +575,7 @@ def auto_format(input_text: str) -> str:
     else:
         # Look for folded indicators (comments, indentation)
         has_comments = any('//' in line for line in lines)
-        has_indentation = any(line.startswith('    ') or line.startswith('\t') for line in lines)
+        has_indentation = any(line.startswith(('    ', '\t')) for line in lines)
         has_excel_header = any('Excel Formula' in line for line in lines)
         
         if has_comments or has_indentation or has_excel_header:
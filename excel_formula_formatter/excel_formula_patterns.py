@@ -13,12 +13,34 @@ cell_ref_range_rgx = re.compile(r'\b[A-Z]+\$?\d+:[A-Z]+\$?\d+\b')
 cell_ref_sheet_rgx = re.compile(r'\b[A-Za-z0-9_]+![A-Z]+\$?\d+(?::[A-Z]+\$?\d+)?\b')
 cell_ref_all_rgx = re.compile(r'\b(?:[A-Za-z0-9_]+!)?[A-Z]+\$?\d+(?::[A-Z]+\$?\d+)?\b')
 
+# Body of an Excel string literal: opening quote and text, with "" as an escaped quote.
+# Unrolled as [^"]*(?:""[^"]*)* so the engine never backtracks between the two forms.
+excel_string_body = r'"[^"]*(?:""[^"]*)*'
+
+# Master tokenizer pattern: one alternative per token kind, tried in priority order.
+# Every character belongs to some alternative, so finditer never skips input.
+excel_token_rgx = re.compile(
+    r'(?P<string>' + excel_string_body + r'"?)'
+    r'|(?P<cell>' + cell_ref_all_rgx.pattern + r')'
+    r'|(?P<op2><>|>=|<=)'
+    r'|(?P<op>[-+*/=<>&])'
+    r'|(?P<punct>[(),\[\]:;!%^])'
+    r'|(?P<ws>\s+)'
+    r'|(?P<word>[^\s+\-*/=<>(),\[\]:;!&%^"]+)'
+)
+
 # Excel function names (common ones)
 excel_functions_rgx = re.compile(r'\b(?:SUM|IF|VLOOKUP|HLOOKUP|INDEX|MATCH|SUMIF|SUMIFS|COUNTIF|COUNTIFS|AVERAGEIF|AVERAGEIFS|LEN|MID|LEFT|RIGHT|FIND|SEARCH|SUBSTITUTE|CONCATENATE|TEXT|VALUE|DATE|TODAY|NOW|YEAR|MONTH|DAY|WEEKDAY|WORKDAY|NETWORKDAYS|PMT|PV|FV|RATE|NPER|NPV|IRR|AND|OR|NOT|ISERROR|ISBLANK|ISNUMBER|ISTEXT|CHOOSE|INDIRECT|OFFSET|ROW|COLUMN|ROWS|COLUMNS|COUNTA|COUNT|MAX|MIN|AVERAGE|MEDIAN|MODE|STDEV|VAR|ROUND|ROUNDUP|ROUNDDOWN|INT|ABS|SQRT|POWER|EXP|LN|LOG|LOG10|SIN|COS|TAN|ASIN|ACOS|ATAN|PI|RAND|RANDBETWEEN|LET|LAMBDA|MAP|FILTER|SORT|UNIQUE|SEQUENCE|XLOOKUP|XMATCH|IFS|SWITCH|TEXTJOIN|CONCAT)\b', re.IGNORECASE)
 
+# Same function names as a set, for exact lookups on plain ASCII word tokens
+excel_function_names = frozenset(excel_functions_rgx.pattern[len(r'\b(?:'):-len(r')\b')].split('|'))
+
 # String literals in Excel (double quotes)
 string_literal_rgx = re.compile(r'"[^"]*"')
 
+# String literal token for the tokenizers (an unclosed quote runs to end of text)
+string_literal_token_rgx = re.compile(excel_string_body + r'"?')
+
 # Number patterns
 number_rgx = re.compile(r'\b\d+(?:\.\d+)?\b')
 
@@ -48,22 +70,18 @@ space_cleanup_whitespace_rgx = re.compile(r'\s+')
 
 # Whitespace and newline patterns
 whitespace_newline_rgx = re.compile(r'\s*\r?\n\s*')
-leading_trailing_space_rgx = re.compile(r'^\s+|\s+$')
 
-# NEW: Cleanup patterns for reverse parsing
-paren_leading_space_rgx = re.compile(r'\(\s+')
-paren_trailing_space_rgx = re.compile(r'\s+\)')
-multiple_spaces_rgx = re.compile(r'\s+')
-comma_spacing_rgx = re.compile(r'\s*,\s*')
+# Same literal as a capture group: split() alternates outside text and string literals
+string_literal_split_rgx = re.compile(r'(' + excel_string_body + r'")')
 
-# String literal protection pattern
-string_literal_protection_rgx = re.compile(r'"[^"]*"')
-
-# Operator spacing cleanup patterns
-operator_spacing_rgx = re.compile(r'\s*([+\-*/=<>!,()])\s*')
-multi_char_operator_spacing_rgx = re.compile(r'\s*(<>|>=|<=|!=)\s*')
+# Whitespace touching an operator, comma or paren; sub('') removes it all
+# (two-character operators included) without a replacement template
+operator_adjacent_space_rgx = re.compile(r'\s+(?=[+\-*/=<>!,()])|(?<=[+\-*/=<>!,()])\s+')
 
 # Comment detection pattern
 comment_line_detection_rgx = re.compile(r'^\s*(?://|#)')
 
+# Any line that starts with a four-space or tab indent (searched over the whole text)
+indented_line_rgx = re.compile(r'^(?:    |\t)', re.MULTILINE)
+
 # End of file #
@@ -8,7 +8,7 @@ import re
 
 from excel_formula_formatter.syntax_translator_base import SyntaxTranslatorBase
 from excel_formula_formatter.excel_formula_patterns import (
-    cell_ref_all_rgx
+    cell_ref_all_rgx, string_literal_rgx
 )
 
 # Define specific patterns needed for JavaScript translator
@@ -18,6 +18,15 @@ js_not_equal_rgx = re.compile(r'!=')
 class JavaScriptTranslator(SyntaxTranslatorBase):
     """Translates Excel formulas to JavaScript-like syntax."""
     
+    mode_code = 'j'
+    
+    # Fixed spacing around parentheses; everything else passes through unchanged
+    _punctuation_map = {'(': '( ', ')': ' )'}
+    
+    def __init__(self, indent_size: int = 4):
+        super().__init__(indent_size)
+        self._operator_cache = {}  # Spaced operator strings, built once per operator
+    
     def get_language_name(self) -> str:
         return "JavaScript"
     
@@ -44,22 +53,15 @@ class JavaScriptTranslator(SyntaxTranslatorBase):
         return number_val
     
     def format_operator(self, operator: str) -> str:
-        # Convert Excel <> to JavaScript !=
-        if operator == '<>':
-            return ' != '
-        elif operator in ['>=', '<=', '=']:
-            return f' {operator} '
-        else:
-            return f' {operator} '
+        # Convert Excel <> to JavaScript !=; every operator gets surrounding spaces
+        formatted = self._operator_cache.get(operator)
+        if formatted is None:
+            formatted = self._operator_cache[operator] = ' != ' if operator == '<>' else f' {operator} '
+        return formatted
     
     def format_punctuation(self, punct: str) -> str:
         # Add spacing around function parentheses for readability (same as Excel modes)
-        if punct == '(':
-            return '( '
-        elif punct == ')':
-            return ' )'
-        else:
-            return punct
+        return self._punctuation_map.get(punct, punct)
     
     def reverse_parse_line(self, line: str) -> str:
         """Convert JavaScript-like line back to Excel syntax."""
@@ -80,7 +82,7 @@ class JavaScriptTranslator(SyntaxTranslatorBase):
             else:
                 return quoted_text  # Keep quotes if not a cell reference
         
-        return re.sub(r'"[^"]*"', unquote_cell_ref, js_text)
+        return string_literal_rgx.sub(unquote_cell_ref, js_text)
     
     def reverse_parse_operator(self, js_text: str) -> str:
         """Convert != back to <>."""
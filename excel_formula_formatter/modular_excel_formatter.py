@@ -12,20 +12,19 @@ File: excel_formula_formatter/modular_excel_formatter.py
 import sys
 import re
 
+from functools import lru_cache
+from itertools import starmap
+
 from excel_formula_formatter.excel_formula_patterns import (
     cell_ref_all_rgx,
     excel_functions_rgx,
+    excel_function_names,
     number_rgx,
-    whitespace_newline_rgx,
-    leading_trailing_space_rgx,
-    paren_leading_space_rgx,
-    paren_trailing_space_rgx,
-    multiple_spaces_rgx,
-    comma_spacing_rgx,
-    string_literal_protection_rgx,
-    operator_spacing_rgx,
-    multi_char_operator_spacing_rgx,
-    comment_line_detection_rgx
+    excel_token_rgx,
+    string_literal_split_rgx,
+    comment_line_detection_rgx,
+    indented_line_rgx,
+    whitespace_newline_rgx
 )
 
 from excel_formula_formatter.syntax_translator_base import SyntaxTranslatorBase
@@ -33,9 +32,142 @@ from excel_formula_formatter.javascript_translator import JavaScriptTranslator
 from excel_formula_formatter.compact_excel_translator import CompactExcelTranslator
 
 
+# Token type codes emitted by the tokenizer (small ints compare faster than strings)
+T_PUNCT, T_STRING, T_CELL, T_OP, T_NUMBER, T_FUNC, T_IDENT = range(7)
+
+# Readable name per token type code, for debug dumps of token lists
+token_type_names = {
+    T_PUNCT: 'punctuation',
+    T_STRING: 'string',
+    T_CELL: 'cell_ref',
+    T_OP: 'operator',
+    T_NUMBER: 'number',
+    T_FUNC: 'function',
+    T_IDENT: 'identifier',
+}
+
+# Token type codes for the non-word groups of excel_token_rgx
+_token_kind_codes = {
+    'string': T_STRING,
+    'cell': T_CELL,
+    'op2': T_OP,
+    'op': T_OP,
+    'punct': T_PUNCT,
+}
+
+# Word tokens that are classified as operators
+_multi_char_operators = frozenset(['<>', '>=', '<=', '==', '!='])
+
+# Nesting change per structural token; the comma (0) splits arguments at depth 0
+_depth_deltas = {'(': 1, ')': -1, ',': 0}
+
+# Characters that compact and JavaScript unfold keep tight against their neighbours
+_tight_spacing_chars = '+-*/=<>!,()'
+
+# Maximum number of distinct formulas memoized per formatter for fold and unfold
+_formula_cache_size = 4096
+
+# Maximum number of distinct (type, text) tokens whose formatted text is memoized
+_token_cache_size = 4096
+
+# Maximum number of distinct formula bodies whose token list is memoized (shared by all modes)
+_parse_cache_size = 4096
+
+# Maximum number of recent editor buffers whose detected mode is memoized
+_mode_detection_cache_size = 64
+
+
+def _find_safe_comment_start(line: str) -> int:
+    """Return the index of the first // not immediately preceded by a comma, or -1."""
+    start = line.find('//')
+    while start >= 0:
+        # If the last non-space character before // is a comma, don't treat it as a comment
+        if not line[:start].rstrip().endswith(','):
+            return start
+        start = line.find('//', start + 1)
+    return -1
+
+
+def _tidy_paren_and_comma_spacing(text: str) -> str:
+    """Drop spaces just inside parentheses and normalize commas to ', '.
+    
+    Requires single-spaced input: whitespace runs must already be collapsed to one
+    space (unfold guarantees this). Only then are these plain replacements exact.
+    """
+    return (text.replace('( ', '(').replace(' )', ')')
+                .replace(' ,', ',').replace(', ', ',').replace(',', ', '))
+
+
+def _strip_operator_spacing(text: str) -> str:
+    """Drop every space next to an operator, comma or parenthesis.
+    
+    Requires single-spaced input: with a longer whitespace run, one space would survive.
+    """
+    for char in _tight_spacing_chars:
+        text = text.replace(' ' + char, char).replace(char + ' ', char)
+    return text
+
+
+def _classify_word(token: str) -> int:
+    """Classify a word token by type."""
+    if token[0].isdigit():
+        # Function names and cell references always start with a letter
+        return T_NUMBER if number_rgx.match(token) else T_IDENT
+    
+    if token.isascii() and token.replace('_', 'A').isalnum():
+        # Plain ASCII word: set lookup is equivalent to the word-bounded regex
+        if token.upper() in excel_function_names:
+            return T_FUNC
+    elif excel_functions_rgx.match(token):
+        return T_FUNC
+    
+    if cell_ref_all_rgx.match(token):
+        return T_CELL
+    elif token in _multi_char_operators:
+        return T_OP
+    else:
+        return T_IDENT
+
+
+def name_token_types(tokens) -> list:
+    """Return (type, text) tokens with each type code replaced by its readable name."""
+    return [(token_type_names[token_type], token_text) for token_type, token_text in tokens]
+
+
+@lru_cache(maxsize=_parse_cache_size)
+def _tokenize_formula(formula: str) -> tuple:
+    """Tokenize a formula body into (type, text) pairs; immutable so it can be memoized."""
+    tokens = []
+    
+    for match in excel_token_rgx.finditer(formula):
+        kind = match.lastgroup
+        if kind == 'ws':
+            continue
+        
+        token_text = match.group(kind)
+        if kind == 'word':
+            # Collect word/number/identifier
+            tokens.append((_classify_word(token_text), token_text))
+        else:
+            tokens.append((_token_kind_codes[kind], token_text))
+    
+    return tuple(tokens)
+
+
 class AnnotatedExcelTranslator(SyntaxTranslatorBase):
     """Annotated Excel translator that preserves Excel syntax with helpful comments."""
     
+    mode_code = 'a'
+    reverse_is_identity = True
+    preserves_operator_spacing = True
+    
+    # Fixed spacing around parentheses; everything else passes through unchanged
+    _punctuation_map = {'(': '( ', ')': ' )'}
+    
+    def __init__(self, indent_size: int = 4):
+        super().__init__(indent_size)
+        self._operator_cache = {}  # Spaced operator strings, built once per operator
+    
     def get_language_name(self) -> str:
         return "Excel (Annotated)"
     
@@ -62,38 +194,18 @@ class AnnotatedExcelTranslator(SyntaxTranslatorBase):
     
     def format_operator(self, operator: str) -> str:
         # Add minimal spacing around operators for readability in annotated mode
-        return f' {operator} '
+        formatted = self._operator_cache.get(operator)
+        if formatted is None:
+            formatted = self._operator_cache[operator] = f' {operator} '
+        return formatted
     
     def format_punctuation(self, punct: str) -> str:
         # Add spacing around function parentheses for readability
-        if punct == '(':
-            return '( '
-        elif punct == ')':
-            return ' )'
-        else:
-            return punct
+        return self._punctuation_map.get(punct, punct)
     
     def reverse_parse_line(self, line: str) -> str:
         """Remove comments safely without consuming commas."""
-        # Look for // that are NOT immediately preceded by a comma
-        comment_pos = -1
-        for i, char in enumerate(line):
-            if char == '/' and i + 1 < len(line) and line[i + 1] == '/':
-                # Found //, check if it's safe to remove
-                # Look back to see if there's a comma without intervening non-space chars
-                safe_to_remove = True
-                look_back = i - 1
-                while look_back >= 0 and line[look_back].isspace():
-                    look_back -= 1
-                
-                # If the last non-space character is a comma, don't remove the comment
-                if look_back >= 0 and line[look_back] == ',':
-                    safe_to_remove = False
-                
-                if safe_to_remove:
-                    comment_pos = i
-                    break
-        
+        comment_pos = _find_safe_comment_start(line)
         if comment_pos >= 0:
             return line[:comment_pos].rstrip()
         else:
@@ -111,6 +223,17 @@ class AnnotatedExcelTranslator(SyntaxTranslatorBase):
 class PlainExcelTranslator(SyntaxTranslatorBase):
     """Plain Excel translator - pure Excel syntax with smart indenting, NO comments."""
     
+    mode_code = 'p'
+    reverse_is_identity = True
+    preserves_operator_spacing = True
+    
+    # Fixed spacing around parentheses; everything else passes through unchanged
+    _punctuation_map = {'(': '( ', ')': ' )'}
+    
+    def __init__(self, indent_size: int = 4):
+        super().__init__(indent_size)
+        self._operator_cache = {}  # Spaced operator strings, built once per operator
+    
     def get_language_name(self) -> str:
         return "Excel (Plain)"
     
@@ -137,16 +260,14 @@ class PlainExcelTranslator(SyntaxTranslatorBase):
     
     def format_operator(self, operator: str) -> str:
         # Add spaces around operators for readability (like Excel Advanced Formula Environment)
-        return f' {operator} '
+        formatted = self._operator_cache.get(operator)
+        if formatted is None:
+            formatted = self._operator_cache[operator] = f' {operator} '
+        return formatted
     
     def format_punctuation(self, punct: str) -> str:
         # Add spacing around function parentheses for readability
-        if punct == '(':
-            return '( '
-        elif punct == ')':
-            return ' )'
-        else:
-            return punct
+        return self._punctuation_map.get(punct, punct)
     
     def reverse_parse_line(self, line: str) -> str:
         """Plain mode should not have comments, but clean line just in case."""
@@ -166,6 +287,33 @@ class ModularExcelFormatter:
     
     def __init__(self, translator: SyntaxTranslatorBase):
         self.translator = translator
+        self._mode_code = translator.mode_code
+        # Translator traits used on every fold/unfold, resolved once here
+        self._reverse_is_identity = translator.reverse_is_identity
+        self._preserves_operator_spacing = translator.preserves_operator_spacing
+        self._is_compact = isinstance(translator, CompactExcelTranslator)
+        # Plain and compact output never keeps blank lines, so the processors never emit them
+        self._suppress_blank_lines = self._is_compact or isinstance(translator, PlainExcelTranslator)
+        # Comma spacing depends on translator: compact keeps commas tight
+        self._comma_suffix = "" if self._is_compact else " "
+        # Jump table from token type to its formatter; other types pass through unchanged
+        self._token_handlers = {
+            T_CELL: translator.format_cell_reference,
+            T_STRING: translator.format_string_literal,
+            T_NUMBER: translator.format_number,
+            T_OP: translator.format_operator,
+            T_FUNC: translator.format_function_call,
+            T_PUNCT: self._format_punctuation_token,
+        }
+        # Indent strings by depth and the IFS/SWITCH separator never change per translator
+        self._indent_cache = {}
+        self._case_separator = translator.format_section_comment("── CASE/RESULT PAIR ──")
+        self._comment_line_cache = {}  # Formatted function comment line per function name
+        # Formatted text per distinct token, shared by every processor
+        self._format_token = lru_cache(maxsize=_token_cache_size)(self._format_token_uncached)
+        # Bounded memo of fold/unfold results; output depends only on the input text
+        self._fold_cached = lru_cache(maxsize=_formula_cache_size)(self._fold_formula_uncached)
+        self._unfold_cached = lru_cache(maxsize=_formula_cache_size)(self._unfold_formula_uncached)
         
     @classmethod
     def create_javascript_formatter(cls):
@@ -204,31 +352,29 @@ class ModularExcelFormatter:
     
     def get_mode_code(self) -> str:
         """Get the single letter mode code for this formatter."""
-        if isinstance(self.translator, JavaScriptTranslator):
-            return 'j'
-        elif isinstance(self.translator, AnnotatedExcelTranslator):
-            return 'a'
-        elif isinstance(self.translator, PlainExcelTranslator):
-            return 'p'
-        elif isinstance(self.translator, CompactExcelTranslator):
-            return 'c'
-        else:
-            return 'unknown'
+        return self._mode_code
     
     def fold_formula(self, formula: str) -> str:
         """Transform Excel formula using the configured translator."""
-        if not formula or not formula.strip():
+        if not formula:
             return ""
-            
-        # Handle array formulas and regular formulas
+        return self._fold_cached(formula)
+    
+    def _fold_formula_uncached(self, formula: str) -> str:
+        """Fold a formula without consulting the memo."""
+        # Strip once; empty and whitespace-only input both end here
         clean_formula = formula.strip()
+        if not clean_formula:
+            return ""
+        
+        # Handle array formulas and regular formulas (slice checks on short literals)
         is_array_formula = False
         
-        if clean_formula.startswith('{=') and clean_formula.endswith('}'):
+        if clean_formula[:2] == '{=' and clean_formula[-1:] == '}':
             # Array formula: {=SUM(...)}
             is_array_formula = True
             clean_formula = clean_formula[2:-1]  # Remove {= and }
-        elif clean_formula.startswith('='):
+        elif clean_formula[:1] == '=':
             # Regular formula: =SUM(...)
             clean_formula = clean_formula[1:]  # Remove =
             
@@ -240,48 +386,50 @@ class ModularExcelFormatter:
         
         # Add array formula markers if needed
         if is_array_formula:
-            # Find where to insert {= (after header comment if present)
-            insert_index = 1 if formatted_lines and formatted_lines[0].startswith('//') else 0
-            formatted_lines.insert(insert_index, '{=')
-            formatted_lines.append('}')
-        
-        # Filter out empty lines for plain and compact modes
-        if isinstance(self.translator, (PlainExcelTranslator, CompactExcelTranslator)):
-            formatted_lines = [line for line in formatted_lines if line.strip()]
+            # Build the wrapped list in one go: header comment (if present), {=, body, }
+            header_count = 1 if formatted_lines and formatted_lines[0].startswith('//') else 0
+            formatted_lines = [*formatted_lines[:header_count], '{=', *formatted_lines[header_count:], '}']
         
         return '\n'.join(formatted_lines)
     
     def unfold_formula(self, formatted_text: str) -> str:
         """Transform formatted text back to Excel formula."""
-        if not formatted_text or not formatted_text.strip():
+        return self._unfold_cached(formatted_text)
+    
+    def _unfold_formula_uncached(self, formatted_text: str) -> str:
+        """Unfold formatted text without consulting the memo."""
+        if not formatted_text or formatted_text.isspace():
             return ""
             
         # Check if this was an array formula
         lines = formatted_text.strip().split('\n')
         is_array_formula = False
         
-        # Look for array formula markers
+        # Look for array formula markers in one pass: the first {= line and the last } line
+        open_index = close_index = -1
         for i, line in enumerate(lines):
-            if line.strip() == '{=':
-                is_array_formula = True
-                # Remove the {= line and find matching }
-                lines = lines[:i] + lines[i+1:]
-                # Find and remove the closing }
-                for j in range(len(lines)-1, -1, -1):
-                    if lines[j].strip() == '}':
-                        lines = lines[:j] + lines[j+1:]
-                        break
-                break
-        
-        # Rejoin after removing array markers
-        formatted_text = '\n'.join(lines)
-        
-        # SAFE comment removal that preserves commas
-        no_comments = self._safe_remove_comments(formatted_text)
+            stripped = line.strip()
+            if stripped == '{=':
+                if open_index < 0:
+                    open_index = i
+            elif stripped == '}':
+                close_index = i
+        
+        if open_index >= 0:
+            is_array_formula = True
+            # Drop both marker lines with a single rebuild
+            lines = [line for i, line in enumerate(lines) if i != open_index and i != close_index]
+        
+        # SAFE comment removal that preserves commas, straight on the line list
+        # (no rejoin and re-split of the whole text in between); text without
+        # any comment marker (plain and compact output) skips the per-line scan
+        if '//' in formatted_text or '#' in formatted_text:
+            no_comments = ' '.join(self._comment_free_lines(lines))
+        else:
+            no_comments = ' '.join(lines)
         
-        # Flatten to single line
-        single_line = whitespace_newline_rgx.sub(' ', no_comments)
-        single_line = leading_trailing_space_rgx.sub('', single_line)
+        # Flatten to single line (split() drops edge whitespace and collapses runs)
+        single_line = ' '.join(no_comments.split())
         
         if not single_line:
             return ""
@@ -301,7 +449,10 @@ class ModularExcelFormatter:
     
     def _safe_remove_comments(self, text: str) -> str:
         """Safely remove comments without consuming commas."""
-        lines = text.split('\n')
+        return '\n'.join(self._comment_free_lines(text.split('\n')))
+    
+    def _comment_free_lines(self, lines: list) -> list:
+        """Return the non-empty lines with comment lines dropped and inline comments cut."""
         cleaned_lines = []
         
         for line in lines:
@@ -310,110 +461,26 @@ class ModularExcelFormatter:
                 continue
             
             # For other lines, carefully remove inline comments
-            # Look for // that are NOT immediately preceded by a comma
-            comment_pos = -1
-            for i, char in enumerate(line):
-                if char == '/' and i + 1 < len(line) and line[i + 1] == '/':
-                    # Found //, check if it's safe to remove
-                    # Look back to see if there's a comma without intervening non-space chars
-                    safe_to_remove = True
-                    look_back = i - 1
-                    while look_back >= 0 and line[look_back].isspace():
-                        look_back -= 1
-                    
-                    # If the last non-space character is a comma, don't remove the comment
-                    if look_back >= 0 and line[look_back] == ',':
-                        safe_to_remove = False
-                    
-                    if safe_to_remove:
-                        comment_pos = i
-                        break
-            
+            comment_pos = _find_safe_comment_start(line)
             if comment_pos >= 0:
                 # Remove comment but preserve everything before it
                 cleaned_line = line[:comment_pos].rstrip()
             else:
                 cleaned_line = line
             
-            if cleaned_line.strip():  # Only add non-empty lines
+            if cleaned_line and not cleaned_line.isspace():  # Only add non-empty lines (no strip copy)
                 cleaned_lines.append(cleaned_line)
         
-        return '\n'.join(cleaned_lines)
+        return cleaned_lines
     
     def _parse_excel_tokens(self, formula: str) -> list:
         """Parse Excel formula into tokens with type information."""
-        tokens = []
-        i = 0
-        length = len(formula)
-        
-        while i < length:
-            # Skip whitespace
-            if formula[i].isspace():
-                i += 1
-                continue
-                
-            # Check for string literals first (quoted text)
-            if formula[i] == '"':
-                end_quote = formula.find('"', i + 1)
-                if end_quote == -1:
-                    end_quote = length  # Unclosed quote, take rest
-                token_text = formula[i:end_quote + 1]
-                tokens.append(('string', token_text))
-                i = end_quote + 1
-                continue
-            
-            # Check for cell references (including ranges and sheet references)
-            cell_match = cell_ref_all_rgx.match(formula, i)
-            if cell_match:
-                token_text = cell_match.group(0)
-                tokens.append(('cell_ref', token_text))
-                i = cell_match.end()
-                continue
-            
-            # Check for two-character operators
-            if i < length - 1:
-                two_char = formula[i:i+2]
-                if two_char in ['<>', '>=', '<=']:
-                    tokens.append(('operator', two_char))
-                    i += 2
-                    continue
-            
-            # Check for single character operators (separate from punctuation)
-            if formula[i] in '+-*/=<>&':
-                tokens.append(('operator', formula[i]))
-                i += 1
-                continue
-            
-            # Check for punctuation
-            if formula[i] in '(),[]:;!%^':
-                tokens.append(('punctuation', formula[i]))
-                i += 1
-                continue
-            
-            # Collect word/number/identifier
-            start = i
-            while i < length and not formula[i].isspace() and formula[i] not in '+-*/=<>(),[]:;!&%^"':
-                i += 1
-            
-            if start < i:
-                token_text = formula[start:i]
-                token_type = self._classify_token(token_text)
-                tokens.append((token_type, token_text))
-                
-        return tokens
+        # Tokenizing does not depend on the translator, so every mode shares one memo
+        return list(_tokenize_formula(formula))
     
-    def _classify_token(self, token: str) -> str:
+    def _classify_token(self, token: str) -> int:
         """Classify a token by type."""
-        if excel_functions_rgx.match(token):
-            return 'function'
-        elif cell_ref_all_rgx.match(token):
-            return 'cell_ref'
-        elif number_rgx.match(token):
-            return 'number'
-        elif token in ['<>', '>=', '<=', '==', '!=']:
-            return 'operator'
-        else:
-            return 'identifier'
+        return _classify_word(token)
     
     def _format_tokens_with_translator(self, tokens: list) -> list:
         """Convert tokens using the configured translator with TRUE function isolation."""
@@ -424,393 +491,360 @@ class ModularExcelFormatter:
         if header:
             lines.append(header)
         
-        # Process tokens with isolated function handling
-        processed_lines = self._process_token_sequence(tokens, base_depth=0)
-        lines.extend(processed_lines)
+        # Process tokens with isolated function handling, appending straight to lines
+        self._process_token_sequence(tokens, 0, lines)
         
         return lines
 
-    def _process_token_sequence(self, tokens: list, base_depth: int) -> list:
-        """Process a sequence of tokens with proper function isolation."""
-        lines = []
-        current_line = ""
+    def _process_token_sequence(self, tokens: list, base_depth: int, lines: list = None) -> list:
+        """Process a sequence of tokens with proper function isolation.
+        
+        Lines are appended to `lines` (a new list if omitted), which is also returned;
+        nested calls share the caller's list, so no per-level copies are made.
+        """
+        indent = self._indent
+        tokens_to_string = self._tokens_to_string
+        if lines is None:
+            lines = []
+        token_count = len(tokens)
+        run_start = 0  # First token of the current run of plain (non-call) tokens
         i = 0
         
-        while i < len(tokens):
+        while i < token_count:
             token_type, token_text = tokens[i]
             
-            if token_type == 'function':
+            # Find the function's argument tokens (between parentheses)
+            if token_type == T_FUNC and i + 1 < token_count and tokens[i + 1][1] == '(':
                 # Handle function calls with complete isolation
                 func_name = token_text.upper()
+                arg_tokens, end_index = self._extract_function_arguments(tokens, i + 1)
                 
-                # Find the function's argument tokens (between parentheses)
-                if i + 1 < len(tokens) and tokens[i + 1][1] == '(':
-                    arg_tokens, end_index = self._extract_function_arguments(tokens, i + 1)
-                    
-                    # Process this function in complete isolation
-                    if func_name in ['IFS', 'SWITCH']:
-                        func_lines = self._process_ifs_function(token_text, arg_tokens, base_depth)
-                    elif func_name == 'LET':
-                        func_lines = self._process_let_function(token_text, arg_tokens, base_depth)
-                    else:
-                        # All other functions (including AND, OR) use simple generic processing
-                        func_lines = self._process_generic_function(token_text, arg_tokens, base_depth)
-                    
-                    # Add the function content
-                    if current_line.strip():
-                        lines.append(self.translator.indent(base_depth) + current_line.strip())
-                        current_line = ""
-                    
-                    lines.extend(func_lines)
-                    i = end_index - 1  # Point to position that will be incremented
-                else:
-                    # Function without parentheses - treat as identifier
-                    current_line += self.translator.format_function_call(token_text)
-            
-            elif token_type == 'cell_ref':
-                current_line += self.translator.format_cell_reference(token_text)
-            elif token_type == 'string':
-                current_line += self.translator.format_string_literal(token_text)
-            elif token_type == 'number':
-                current_line += self.translator.format_number(token_text)
-            elif token_type == 'operator':
-                current_line += self.translator.format_operator(token_text)
-            elif token_type == 'punctuation' and token_text == ',':
-                # Top-level comma - handle spacing based on translator
-                if isinstance(self.translator, CompactExcelTranslator):
-                    current_line += self.translator.format_punctuation(token_text)  # No space
+                # Emit the plain tokens before the call as one joined line
+                if run_start < i:
+                    text = tokens_to_string(tokens, run_start, i)
+                    if text:
+                        lines.append(indent(base_depth) + text)
+                
+                # Process this function in complete isolation
+                if func_name in ('IFS', 'SWITCH'):
+                    self._process_ifs_function(token_text, arg_tokens, base_depth, lines)
+                elif func_name == 'LET':
+                    self._process_let_function(token_text, arg_tokens, base_depth, lines)
                 else:
-                    current_line += self.translator.format_punctuation(token_text) + " "  # Add space
-            elif token_type == 'punctuation':
-                current_line += self.translator.format_punctuation(token_text)
+                    # All other functions (including AND, OR) use simple generic processing
+                    self._process_generic_function(token_text, arg_tokens, base_depth, lines)
+                
+                i = run_start = end_index
             else:
-                current_line += token_text
-            
-            i += 1
+                # Everything else (including functions without parentheses) joins the current run
+                i += 1
         
         # Add any remaining content
-        if current_line.strip():
-            lines.append(self.translator.indent(base_depth) + current_line.strip())
+        if run_start < token_count:
+            text = tokens_to_string(tokens, run_start, token_count)
+            if text:
+                lines.append(indent(base_depth) + text)
         
         return lines
 
+    def _function_comment_line(self, func_name: str) -> str:
+        """Return the translator's section comment for a function ('' if none), built once per name."""
+        comment_line = self._comment_line_cache.get(func_name)
+        if comment_line is None:
+            comment = self.translator.get_function_comment(func_name)
+            comment_line = self.translator.format_section_comment(comment) if comment else ""
+            self._comment_line_cache[func_name] = comment_line = comment_line or ""
+        return comment_line
+
+    def _indent(self, depth: int) -> str:
+        """Return the translator's indentation string for a depth, building it once."""
+        indent_str = self._indent_cache.get(depth)
+        if indent_str is None:
+            indent_str = self._indent_cache[depth] = self.translator.indent(depth)
+        return indent_str
+
+    def _format_token_uncached(self, token_type: int, token_text: str) -> str:
+        """Translate a single token to its formatted text."""
+        handler = self._token_handlers.get(token_type)
+        if handler is not None:
+            return handler(token_text)
+        return token_text
+
+    def _format_punctuation_token(self, punct: str) -> str:
+        """Format punctuation, adding the translator's spacing after commas."""
+        if punct == ',':
+            return self.translator.format_punctuation(punct) + self._comma_suffix
+        return self.translator.format_punctuation(punct)
+
     def _extract_function_arguments(self, tokens: list, paren_start: int) -> tuple:
         """Extract tokens between matching parentheses."""
         if tokens[paren_start][1] != '(':
             return [], paren_start
         
-        arg_tokens = []
+        # Scan only the token texts; the argument list is one slice of the existing tuples
         depth = 1
         i = paren_start + 1
+        token_count = len(tokens)
         
-        while i < len(tokens) and depth > 0:
-            token_type, token_text = tokens[i]
+        while i < token_count:
+            token_text = tokens[i][1]
             
             if token_text == '(':
                 depth += 1
             elif token_text == ')':
                 depth -= 1
-                
-            if depth > 0:  # Don't include the final closing paren
-                arg_tokens.append((token_type, token_text))
+                if depth == 0:
+                    # Don't include the final closing paren
+                    return tokens[paren_start + 1:i], i + 1
             
             i += 1
         
-        return arg_tokens, i
+        # Unbalanced parentheses: the arguments run to the end of the tokens
+        return tokens[paren_start + 1:], i
 
-    def _process_ifs_function(self, func_name: str, arg_tokens: list, base_depth: int) -> list:
-        """Process IFS/SWITCH function in complete isolation."""
-        lines = []
+    def _process_ifs_function(self, func_name: str, arg_tokens: list, base_depth: int, lines: list = None) -> list:
+        """Process IFS/SWITCH function in complete isolation. Appends to and returns `lines`."""
+        translator = self.translator
+        fmt_punct = translator.format_punctuation
+        fmt_func = translator.format_function_call
+        indent = self._indent
+        if lines is None:
+            lines = []
         
         # Add function comment only if translator supports it
-        comment = self.translator.get_function_comment(func_name)
-        if comment:
-            comment_line = self.translator.format_section_comment(comment)
-            if comment_line:  # Only add if translator returns non-empty comment
-                lines.append(self.translator.indent(base_depth) + comment_line)
+        comment_line = self._function_comment_line(func_name)
+        if comment_line:  # Only add if translator returns non-empty comment
+            lines.append(indent(base_depth) + comment_line)
         
         # Function header
-        lines.append(self.translator.indent(base_depth) + 
-                    self.translator.format_function_call(func_name) + 
-                    self.translator.format_punctuation('('))
+        lines.append(indent(base_depth) + fmt_func(func_name) + fmt_punct('('))
         
         # Split arguments by top-level commas
-        argument_groups = self._split_by_top_level_commas(arg_tokens)
+        argument_spans = list(self._iter_top_level_comma_spans(arg_tokens))
         
         # Add initial separator only if we have arguments and translator supports comments
-        if argument_groups:
-            separator = self.translator.format_section_comment("── CASE/RESULT PAIR ──")
+        if argument_spans:
+            separator = self._case_separator
             if separator:  # Only add if translator returns non-empty separator
-                lines.append(self.translator.indent(base_depth + 1) + separator)
+                lines.append(indent(base_depth + 1) + separator)
         
-        for arg_index, arg_group in enumerate(argument_groups):
+        for arg_index, (start, end) in enumerate(argument_spans):
             # Add separator before each condition (even arguments > 1)
             if arg_index > 1 and arg_index % 2 == 0:
-                separator = self.translator.format_section_comment("── CASE/RESULT PAIR ──")
+                separator = self._case_separator
                 if separator:  # Only add if translator returns non-empty separator
-                    lines.append("")  # Blank line
-                    lines.append(self.translator.indent(base_depth + 1) + separator)
+                    if not self._suppress_blank_lines:
+                        lines.append("")  # Blank line
+                    lines.append(indent(base_depth + 1) + separator)
             
             # Process this argument group
-            arg_lines = self._process_token_sequence(arg_group, base_depth + 1)
+            arg_line_start = len(lines)
+            self._process_token_sequence(arg_tokens[start:end], base_depth + 1, lines)
             
             # Add comma if not last argument
-            if arg_index < len(argument_groups) - 1:
-                if arg_lines:
-                    arg_lines[-1] += self.translator.format_punctuation(',')
+            if arg_index < len(argument_spans) - 1:
+                if len(lines) > arg_line_start:
+                    lines[-1] += fmt_punct(',')
                 else:
-                    lines.append(self.translator.indent(base_depth + 1) + self.translator.format_punctuation(','))
-            
-            lines.extend(arg_lines)
+                    lines.append(indent(base_depth + 1) + fmt_punct(','))
         
         # Closing paren
-        lines.append(self.translator.indent(base_depth) + self.translator.format_punctuation(')'))
+        lines.append(indent(base_depth) + fmt_punct(')'))
         
         return lines
 
-    def _process_let_function(self, func_name: str, arg_tokens: list, base_depth: int) -> list:
-        """Process LET function in complete isolation."""
-        lines = []
+    def _process_let_function(self, func_name: str, arg_tokens: list, base_depth: int, lines: list = None) -> list:
+        """Process LET function in complete isolation. Appends to and returns `lines`."""
+        translator = self.translator
+        fmt_punct = translator.format_punctuation
+        fmt_func = translator.format_function_call
+        indent = self._indent
+        if lines is None:
+            lines = []
         
         # Add function comment if translator supports it
-        comment = self.translator.get_function_comment(func_name)
-        if comment:
-            comment_line = self.translator.format_section_comment(comment)
-            if comment_line:
-                lines.append(self.translator.indent(base_depth) + comment_line)
+        comment_line = self._function_comment_line(func_name)
+        if comment_line:
+            lines.append(indent(base_depth) + comment_line)
         
         # Function header
-        lines.append(self.translator.indent(base_depth) + 
-                    self.translator.format_function_call(func_name) + 
-                    self.translator.format_punctuation('('))
+        lines.append(indent(base_depth) + fmt_func(func_name) + fmt_punct('('))
         
         # Split arguments by top-level commas
-        argument_groups = self._split_by_top_level_commas(arg_tokens)
+        argument_spans = list(self._iter_top_level_comma_spans(arg_tokens))
         
         i = 0
-        while i < len(argument_groups):
+        while i < len(argument_spans):
             # LET pairs: keep variable name and value on same line
-            if i % 2 == 0 and i + 1 < len(argument_groups):
+            if i % 2 == 0 and i + 1 < len(argument_spans):
                 # Process variable name (should be simple identifier)
-                var_name = self._tokens_to_string(argument_groups[i]).strip()
+                var_name = self._tokens_to_string(arg_tokens, *argument_spans[i])
                 
                 # Process value (could be complex expression)
-                value_str = self._tokens_to_string(argument_groups[i + 1]).strip()
+                value_str = self._tokens_to_string(arg_tokens, *argument_spans[i + 1])
                 
                 # Combine on same line: variable, value,
-                if isinstance(self.translator, CompactExcelTranslator):
-                    combined_line = (self.translator.indent(base_depth + 1) + var_name + 
-                                   self.translator.format_punctuation(',') + value_str)
-                else:
-                    combined_line = (self.translator.indent(base_depth + 1) + var_name + 
-                                   self.translator.format_punctuation(',') + " " + value_str)
+                combined_line = (indent(base_depth + 1) + var_name + 
+                                 fmt_punct(',') + self._comma_suffix + value_str)
                 
                 # Add comma if not the last pair (check if this isn't the final expression)
-                if i + 2 < len(argument_groups):
-                    combined_line += self.translator.format_punctuation(',')
+                if i + 2 < len(argument_spans):
+                    combined_line += fmt_punct(',')
                 
                 lines.append(combined_line)
                 i += 2  # Skip both variable and value
             else:
                 # Final expression (not a pair) - should be the last argument
-                final_expr_lines = self._process_token_sequence(argument_groups[i], base_depth + 1)
-                lines.extend(final_expr_lines)
+                start, end = argument_spans[i]
+                self._process_token_sequence(arg_tokens[start:end], base_depth + 1, lines)
                 i += 1
         
         # Closing paren
-        lines.append(self.translator.indent(base_depth) + self.translator.format_punctuation(')'))
+        lines.append(indent(base_depth) + fmt_punct(')'))
         
         return lines
 
-    def _process_generic_function(self, func_name: str, arg_tokens: list, base_depth: int) -> list:
-        """Process all functions with simple, consistent formatting."""
-        lines = []
-        
-        # Split arguments by top-level commas
-        argument_groups = self._split_by_top_level_commas(arg_tokens)
-        
-        # Filter out any empty argument groups
-        argument_groups = [group for group in argument_groups if group]
-        
-        if not argument_groups:
+    def _process_generic_function(self, func_name: str, arg_tokens: list, base_depth: int, lines: list = None) -> list:
+        """Process all functions with simple, consistent formatting. Appends to and returns `lines`."""
+        translator = self.translator
+        fmt_punct = translator.format_punctuation
+        fmt_func = translator.format_function_call
+        indent = self._indent
+        if lines is None:
+            lines = []
+        
+        # Split arguments by top-level commas (empty groups are never yielded)
+        argument_spans = list(self._iter_top_level_comma_spans(arg_tokens))
+        
+        if not argument_spans:
             # Empty function call
-            func_str = (self.translator.format_function_call(func_name) + 
-                       self.translator.format_punctuation('(') + 
-                       self.translator.format_punctuation(')'))
-            lines.append(self.translator.indent(base_depth) + func_str)
+            func_str = fmt_func(func_name) + fmt_punct('(') + fmt_punct(')')
+            lines.append(indent(base_depth) + func_str)
             return lines
         
         # Check for simple inline case: one argument with simple content
-        if len(argument_groups) == 1:
-            arg_str = self._tokens_to_string(argument_groups[0]).strip()
-            
-            # Simple inline criteria: one argument, reasonable length, no nested functions
-            has_nested_functions = any(token_type == 'function' for token_type, _ in argument_groups[0])
-            total_length = len(func_name) + len(arg_str) + 2  # +2 for parentheses
-            
-            if not has_nested_functions and total_length <= 40:
-                # Keep inline
-                func_str = (self.translator.format_function_call(func_name) + 
-                           self.translator.format_punctuation('(') + 
-                           arg_str + 
-                           self.translator.format_punctuation(')'))
-                lines.append(self.translator.indent(base_depth) + func_str)
-                return lines
+        if len(argument_spans) == 1:
+            start, end = argument_spans[0]
+            
+            # Simple inline criteria: one argument, no nested functions, reasonable length.
+            # The argument text is only built (once) when the cheap nesting check passes.
+            has_nested_functions = any(arg_tokens[k][0] == T_FUNC for k in range(start, end))
+            if not has_nested_functions:
+                arg_str = self._tokens_to_string(arg_tokens, start, end)
+                total_length = len(func_name) + len(arg_str) + 2  # +2 for parentheses
+                
+                if total_length <= 40:
+                    # Keep inline
+                    func_str = fmt_func(func_name) + fmt_punct('(') + arg_str + fmt_punct(')')
+                    lines.append(indent(base_depth) + func_str)
+                    return lines
         
         # Multi-line formatting: one argument per line
-        lines.append(self.translator.indent(base_depth) + 
-                    self.translator.format_function_call(func_name) + 
-                    self.translator.format_punctuation('('))
+        lines.append(indent(base_depth) + fmt_func(func_name) + fmt_punct('('))
         
         # Process each argument on its own line
-        for arg_index, arg_group in enumerate(argument_groups):
-            arg_lines = self._process_token_sequence(arg_group, base_depth + 1)
+        for arg_index, (start, end) in enumerate(argument_spans):
+            arg_line_start = len(lines)
+            self._process_token_sequence(arg_tokens[start:end], base_depth + 1, lines)
             
             # Add comma if not last argument
-            if arg_index < len(argument_groups) - 1:
-                if arg_lines:
-                    arg_lines[-1] += self.translator.format_punctuation(',')
-            
-            lines.extend(arg_lines)
+            if arg_index < len(argument_spans) - 1:
+                if len(lines) > arg_line_start:
+                    lines[-1] += fmt_punct(',')
         
         # Closing parenthesis
-        lines.append(self.translator.indent(base_depth) + self.translator.format_punctuation(')'))
+        lines.append(indent(base_depth) + fmt_punct(')'))
         
         return lines
 
+    def _iter_top_level_comma_spans(self, tokens: list):
+        """Yield (start, end) index pairs of the non-empty groups between top-level commas."""
+        depth_delta = _depth_deltas.get
+        depth = 0
+        start = 0
+        
+        for index, (token_type, token_text) in enumerate(tokens):
+            delta = depth_delta(token_text)
+            if delta is None:
+                continue  # Not a paren or comma: one lookup and done
+            if delta:
+                depth += delta
+            elif depth == 0:
+                # Top-level comma - the comma itself belongs to neither group
+                if start < index:
+                    yield start, index
+                start = index + 1
+        
+        if start < len(tokens):
+            yield start, len(tokens)
+
     def _split_by_top_level_commas(self, tokens: list) -> list:
         """Split tokens by commas that are at the top level (depth 0)."""
-        if not tokens:
-            return []
-            
-        groups = []
-        current_group = []
-        depth = 0
-        
-        for token_type, token_text in tokens:
-            if token_text == '(':
-                depth += 1
-                current_group.append((token_type, token_text))
-            elif token_text == ')':
-                depth -= 1
-                current_group.append((token_type, token_text))
-            elif token_text == ',' and depth == 0:
-                # Top-level comma - start new group only if current group has content
-                if current_group:
-                    groups.append(current_group)
-                    current_group = []
-                # Don't add the comma to either group - it's just a separator
-            else:
-                # Add all other tokens including whitespace (we'll filter later if needed)
-                current_group.append((token_type, token_text))
-        
-        # Add the last group only if it has content
-        if current_group:
-            groups.append(current_group)
-        
-        # Filter out completely empty groups, but preserve groups with meaningful content
-        filtered_groups = []
-        for group in groups:
-            # Check if group has any non-whitespace content
-            has_content = any(token_text.strip() for token_type, token_text in group)
-            if has_content:
-                filtered_groups.append(group)
-        
-        return filtered_groups
-
-    def _tokens_to_string(self, tokens: list) -> str:
-        """Convert token sequence to formatted string."""
-        result = ""
-        for i, (token_type, token_text) in enumerate(tokens):
-            if token_type == 'cell_ref':
-                result += self.translator.format_cell_reference(token_text)
-            elif token_type == 'string':
-                result += self.translator.format_string_literal(token_text)
-            elif token_type == 'number':
-                result += self.translator.format_number(token_text)
-            elif token_type == 'operator':
-                result += self.translator.format_operator(token_text)
-            elif token_type == 'function':
-                result += self.translator.format_function_call(token_text)
-            elif token_type == 'punctuation':
-                if token_text == ',':
-                    if isinstance(self.translator, CompactExcelTranslator):
-                        result += ','  # No space after comma in compact mode
-                    else:
-                        result += ', '  # Always add space after comma in non-compact modes
-                else:
-                    result += self.translator.format_punctuation(token_text)
-            else:
-                result += token_text
-        
-        return result.strip()
+        return [tokens[start:end] for start, end in self._iter_top_level_comma_spans(tokens)]
+
+    def _tokens_to_string(self, tokens: list, start: int = 0, end: int = None) -> str:
+        """Convert token sequence (or the tokens[start:end] span of it) to formatted string."""
+        # starmap drives the per-token calls from C instead of a Python-level loop
+        return ''.join(starmap(self._format_token, tokens[start:end])).strip()
     
     def _reverse_parse_with_translator(self, formatted_text: str) -> str:
         """Use translator-specific reverse parsing."""
         result = formatted_text
         
-        # Apply translator-specific reverse transformations
-        result = self.translator.reverse_parse_cell_reference(result)
-        result = self.translator.reverse_parse_operator(result)
-        
-        # Apply line-level reverse parsing if available
-        if hasattr(self.translator, 'reverse_parse_line'):
-            result = self.translator.reverse_parse_line(result)
-        
-        # Clean up spacing more carefully
-        # Remove extra spaces around parentheses that were added for formatting
-        result = paren_leading_space_rgx.sub('(', result)
-        result = paren_trailing_space_rgx.sub(')', result)
-        
-        # Normalize multiple spaces to single spaces
-        result = multiple_spaces_rgx.sub(' ', result)
-        
-        # Clean up comma spacing - add space after comma, none before
-        result = comma_spacing_rgx.sub(', ', result)
-        
-        # For Excel modes (except compact), preserve some operator spacing for readability
-        if isinstance(self.translator, (AnnotatedExcelTranslator, PlainExcelTranslator)):
-            # Keep spaces around operators if translator added them
-            pass  # Don't strip operator spacing for Excel modes
-        elif isinstance(self.translator, CompactExcelTranslator):
+        # Excel-syntax translators have nothing to reverse on a flattened line; skip the calls
+        if not self._reverse_is_identity:
+            # Apply translator-specific reverse transformations
+            result = self.translator.reverse_parse_cell_reference(result)
+            result = self.translator.reverse_parse_operator(result)
+            
+            # Apply line-level reverse parsing if available
+            if hasattr(self.translator, 'reverse_parse_line'):
+                result = self.translator.reverse_parse_line(result)
+            
+            # Unquoting can expose a space kept inside quotes; restore the single-space form
+            if '  ' in result:
+                result = ' '.join(result.split())
+        
+        # Clean up spacing: the line arrives single-spaced, so one helper call replaces
+        # the old chain of regex passes over the whole text
+        if self._preserves_operator_spacing:
+            # Keep spaces around operators for Excel modes; only parens and commas are tidied
+            result = _tidy_paren_and_comma_spacing(result)
+        elif self._is_compact:
             # For compact mode, remove ALL unnecessary spaces except in string literals
-            # First protect string literals
-            string_parts = []
-            def replace_string(match):
-                string_parts.append(match.group(0))
-                return f"__STRING_{len(string_parts)-1}__"
-            
-            result = string_literal_protection_rgx.sub(replace_string, result)
-            
-            # Remove spaces around operators and commas
-            result = operator_spacing_rgx.sub(r'\1', result)
-            result = multi_char_operator_spacing_rgx.sub(r'\1', result)
-            
-            # Restore string literals
-            for i, string_literal in enumerate(string_parts):
-                result = result.replace(f"__STRING_{i}__", string_literal)
+            # (split() puts the literals at the odd indexes)
+            parts = string_literal_split_rgx.split(_tidy_paren_and_comma_spacing(result))
+            parts[::2] = [_strip_operator_spacing(part) for part in parts[::2]]
+            result = ''.join(parts)
         else:
-            # For JavaScript mode, clean up operator spacing 
-            result = operator_spacing_rgx.sub(r'\1', result)
-            result = multi_char_operator_spacing_rgx.sub(r'\1', result)
+            # For JavaScript mode, stripping operator spacing also covers parens and commas
+            result = _strip_operator_spacing(result)
         
         return result.strip()
 
 
+@lru_cache(maxsize=None)
+def get_formatter(mode: str) -> ModularExcelFormatter:
+    """Return a shared formatter for a mode code (formatters hold no per-formula state).
+    
+    Their memo tables are lru_cache wrappers, which are safe to share between threads,
+    so one instance per mode serves the whole process.
+    """
+    return ModularExcelFormatter.create_formatter_by_mode(mode)
+
+
+@lru_cache(maxsize=_mode_detection_cache_size)
 def detect_current_mode(text: str) -> str:
     """Detect what formatter mode the text is currently in."""
-    if not text or not text.strip():
+    # Stripped once; the mode checks below work on this text directly
+    text_content = text.strip() if text else ''
+    if not text_content:
         return 'unknown'
     
-    lines = text.strip().split('\n')
-    
     # Single line is likely unfolded (plain Excel)
-    if len(lines) == 1:
+    if '\n' not in text_content:
         return 'p'  # Plain
     
-    # Check for mode indicators
-    text_content = '\n'.join(lines)
-    
     # Check for explicit mode indicators in comments first
     if '//' in text_content:
         if 'JavaScript syntax' in text_content:
@@ -827,17 +861,18 @@ def detect_current_mode(text: str) -> str:
             else:
                 return 'a'  # Has comments but no quotes, likely Annotated
     
-    # No comments found - check indentation patterns
-    has_indentation = any(line.startswith('    ') or line.startswith('\t') for line in lines)
+    # No comments found - check indentation patterns (one regex scan, no per-line calls)
+    has_indentation = indented_line_rgx.search(text_content) is not None
     
     if has_indentation:
         # Has indentation but NO comments - could be Plain or Compact Excel mode
         # Look for spacing patterns to distinguish
         # Compact mode would have minimal spacing around operators and commas
         sample_line = ""
-        for line in lines:
-            if line.strip() and not line.strip().startswith('//'):
-                sample_line = line.strip()
+        for line in text_content.split('\n'):
+            stripped_line = line.strip()  # Strip once per line
+            if stripped_line and not stripped_line.startswith('//'):
+                sample_line = stripped_line
                 break
         
         if sample_line:
@@ -857,20 +892,22 @@ def detect_current_mode(text: str) -> str:
 
 def safe_mode_switch(text: str, current_mode: str, target_mode: str, should_refold: bool = True) -> str:
     """Safely switch between formatter modes by unfolding first."""
-    if not text or not text.strip():
+    # Blank text and same-mode switches return before any formatter work;
+    # isspace() answers the blank test without copying the whole buffer like strip() would
+    if not text or text.isspace():
         return ""
     
     if current_mode == target_mode:
         return text  # No change needed
     
     try:
-        # Step 1: Unfold using current mode formatter
-        current_formatter = ModularExcelFormatter.create_formatter_by_mode(current_mode)
+        # Step 1: Unfold using current mode formatter (shared per mode, like auto_format_with_mode)
+        current_formatter = get_formatter(current_mode)
         unfolded = current_formatter.unfold_formula(text)
         
         # Step 2: If requested, fold using target mode formatter
         if should_refold:
-            target_formatter = ModularExcelFormatter.create_formatter_by_mode(target_mode)
+            target_formatter = get_formatter(target_mode)
             return target_formatter.fold_formula(unfolded)
         else:
             # Just return unfolded
@@ -883,37 +920,39 @@ def safe_mode_switch(text: str, current_mode: str, target_mode: str, should_refo
 
 def auto_format_with_mode(input_text: str, mode: str = 'j') -> str:
     """Automatically determine whether to fold or unfold using specified mode."""
-    if not input_text or not input_text.strip():
+    if not input_text:
         return ""
     
-    # Create formatter with specified mode
-    formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+    stripped_text = input_text.strip()
+    if not stripped_text:
+        return ""
     
-    lines = input_text.strip().split('\n')
+    # Reuse the cached formatter for the specified mode
+    formatter = get_formatter(mode)
     
-    # Single line - likely needs folding
-    if len(lines) == 1:
-        line = lines[0].strip()
+    # Single line - likely needs folding (inspected in place, no line split)
+    if '\n' not in stripped_text:
         # Check if it looks like an Excel formula
-        if line.startswith('=') or line.startswith('{='):
-            return formatter.fold_formula(line)
+        if stripped_text.startswith(('=', '{=')):
+            return formatter.fold_formula(stripped_text)
         else:
             return input_text  # Not an Excel formula, return as-is
     
     # Multi-line - check if it's already folded or needs unfolding  
     else:
         # Look for folded indicators (comments, indentation)
-        has_comments = any('//' in line for line in lines)
-        has_indentation = any(line.startswith('    ') or line.startswith('\t') for line in lines)
+        has_comments = '//' in stripped_text
+        has_indentation = indented_line_rgx.search(stripped_text) is not None
         
         if has_comments or has_indentation:
             # Appears to be folded - unfold it
             return formatter.unfold_formula(input_text)
         else:
             # Multi-line but no folding indicators - manual line breaks?
-            # Try to fold it as if it were a single line
-            single_line = ' '.join(line.strip() for line in lines if line.strip())
-            if single_line.startswith('=') or single_line.startswith('{='):
+            # Try to fold it as if it were a single line: each line break and the
+            # whitespace around it (blank lines included) becomes one space
+            single_line = whitespace_newline_rgx.sub(' ', stripped_text)
+            if single_line.startswith(('=', '{=')):
                 return formatter.fold_formula(single_line)
             else:
                 return input_text  # Can't determine format, return as-is
@@ -940,7 +979,8 @@ def main():
         return 1
     
     try:
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+        # Same shared instance that auto_format_with_mode uses below
+        formatter = get_formatter(mode)
     except ValueError as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
@@ -35,9 +35,15 @@ class SimpleExcelEditor:
         self.console = Console()
         self.formatter = ModularExcelFormatter.create_javascript_formatter()
         self.text = ""
+        # The header never changes, so it is built once instead of on every redraw
+        self._header_panel = self._build_header_panel()
         
     def show_header(self):
         """Display header with instructions."""
+        return self._header_panel
+    
+    def _build_header_panel(self):
+        """Build the static header panel with instructions."""
         header = Table.grid(padding=1)
         header.add_column(style="bold blue")
         header.add_column(style="bold green")
@@ -55,7 +61,7 @@ class SimpleExcelEditor:
     
     def display_text(self):
         """Display current text with syntax highlighting."""
-        if not self.text.strip():
+        if not self.text or self.text.isspace():
             content = Text("(No content - press P to paste or E to edit)", style="dim")
             title = "Formula Content"
         else:
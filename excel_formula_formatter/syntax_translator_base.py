@@ -10,6 +10,42 @@ from abc import ABC, abstractmethod
 class SyntaxTranslatorBase(ABC):
     """Base class for translating Excel tokens to target language syntax."""
     
+    # Single letter mode code reported by ModularExcelFormatter.get_mode_code()
+    mode_code = 'unknown'
+    
+    # True when the reverse_parse_* methods leave an already flattened, comment-free line unchanged
+    reverse_is_identity = False
+    
+    # True when unfold keeps the spaces this translator puts around operators
+    preserves_operator_spacing = False
+    
+    # Descriptive comments for common Excel functions, keyed by upper-case name
+    _function_comments = {
+        'SUM': 'Sum values',
+        'IF': 'Conditional logic',
+        'VLOOKUP': 'Vertical lookup',
+        'HLOOKUP': 'Horizontal lookup',
+        'INDEX': 'Index lookup',
+        'MATCH': 'Find position',
+        'SUMIF': 'Conditional sum',
+        'SUMIFS': 'Multiple criteria sum',
+        'COUNTIF': 'Conditional count',
+        'COUNTIFS': 'Multiple criteria count',
+        'CONCATENATE': 'Text concatenation',
+        'TEXTJOIN': 'Join text with delimiter',
+        'LET': 'Variable assignments',
+        'LAMBDA': 'Function definition',
+        'AND': 'Logical AND',
+        'OR': 'Logical OR',
+        'NOT': 'Logical NOT',
+        'FILTER': 'Filter array',
+        'SORT': 'Sort array',
+        'UNIQUE': 'Unique values',
+        'XLOOKUP': 'Extended lookup',
+        'XMATCH': 'Extended match',
+        'IFS': 'Multiple conditions'
+    }
+    
     def __init__(self, indent_size: int = 4):
         self.indent_size = indent_size
     
@@ -84,31 +120,6 @@ class SyntaxTranslatorBase(ABC):
     
     def get_function_comment(self, function_name: str) -> str:
         """Get descriptive comment for common Excel functions."""
-        comments = {
-            'SUM': 'Sum values',
-            'IF': 'Conditional logic', 
-            'VLOOKUP': 'Vertical lookup',
-            'HLOOKUP': 'Horizontal lookup',
-            'INDEX': 'Index lookup',
-            'MATCH': 'Find position',
-            'SUMIF': 'Conditional sum',
-            'SUMIFS': 'Multiple criteria sum',
-            'COUNTIF': 'Conditional count',
-            'COUNTIFS': 'Multiple criteria count',
-            'CONCATENATE': 'Text concatenation',
-            'TEXTJOIN': 'Join text with delimiter',
-            'LET': 'Variable assignments',
-            'LAMBDA': 'Function definition',
-            'AND': 'Logical AND',
-            'OR': 'Logical OR',
-            'NOT': 'Logical NOT',
-            'FILTER': 'Filter array',
-            'SORT': 'Sort array',
-            'UNIQUE': 'Unique values',
-            'XLOOKUP': 'Extended lookup',
-            'XMATCH': 'Extended match',
-            'IFS': 'Multiple conditions'
-        }
-        return comments.get(function_name.upper(), '')
+        return self._function_comments.get(function_name.upper(), '')
 
 # End of file #
@@ -6,45 +6,69 @@ File: comma_diagnostic_tool.py
 
 import re
 
+from collections import namedtuple
+
+
+# Shared fragments for the diagnostic and fix patterns
+_function_name_body = r'[A-Z_][A-Z0-9_]*'
+_identifier_body = r'[a-zA-Z_][a-zA-Z0-9_]*'
+_checked_functions = r'NOT|AND|OR|IF|SUM|LEN'
+
+# One record per suspected missing comma
+Issue = namedtuple('Issue', 'line position text description line_content')
+
+# Compiled once at import; checked against every line of the formula
+_missing_comma_patterns = [
+    # Function name directly followed by another function name (missing comma)
+    (re.compile(rf'({_function_name_body})\s*({_function_name_body})\s*\(', re.IGNORECASE),
+     'Function name followed by another function (missing comma?)'),
+    
+    # Cell reference followed by function name (missing comma)
+    (re.compile(rf'([A-Z]+\d+)\s*({_function_name_body})\s*\(', re.IGNORECASE),
+     'Cell reference followed by function (missing comma?)'),
+    
+    # Closing paren followed by opening paren without comma
+    (re.compile(rf'\)\s*({_function_name_body})\s*\(', re.IGNORECASE),
+     'Function call followed by another function (missing comma?)'),
+    
+    # Variable name followed by function call (common in LET)
+    (re.compile(rf'({_identifier_body})\s*({_checked_functions})\s*\(', re.IGNORECASE),
+     'Variable followed by function (missing comma?)'),
+    
+    # Two NOT functions without comma
+    (re.compile(r'NOT\s*\(\s*[^)]+\)\s*NOT\s*\(', re.IGNORECASE),
+     'Multiple NOT functions (missing comma?)'),
+]
+
+# Deletes spaces and tabs when comparing lines against known problems
+_blank_deletion_table = str.maketrans('', '', ' \t')
+
+# Common fixes for the patterns above
+_missing_comma_fixes = [
+    # Variable name followed by function call
+    (re.compile(rf'({_identifier_body})\s*({_checked_functions})\s*\(', re.IGNORECASE),
+     r'\1, \2('),
+    
+    # Function followed by another function
+    (re.compile(rf'({_function_name_body})\s*\(\s*[^)]+\)\s*({_checked_functions})\s*\(',
+                re.IGNORECASE),
+     r'\1(...), \2('),  # Simplified - would need more complex logic for real fixes
+]
+
 
 def find_missing_commas(formula_text: str) -> list:
     """Find patterns that suggest missing commas."""
     issues = []
     lines = formula_text.split('\n')
     
-    patterns_to_check = [
-        # Function name directly followed by another function name (missing comma)
-        (r'([A-Z_][A-Z0-9_]*)\s*([A-Z_][A-Z0-9_]*)\s*\(', 
-         'Function name followed by another function (missing comma?)'),
-        
-        # Cell reference followed by function name (missing comma)
-        (r'([A-Z]+\d+)\s*([A-Z_][A-Z0-9_]*)\s*\(', 
-         'Cell reference followed by function (missing comma?)'),
-        
-        # Closing paren followed by opening paren without comma
-        (r'\)\s*([A-Z_][A-Z0-9_]*)\s*\(', 
-         'Function call followed by another function (missing comma?)'),
-        
-        # Variable name followed by function call (common in LET)
-        (r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(NOT|AND|OR|IF|SUM|LEN)\s*\(', 
-         'Variable followed by function (missing comma?)'),
-        
-        # Two NOT functions without comma
-        (r'NOT\s*\(\s*[^)]+\)\s*NOT\s*\(', 
-         'Multiple NOT functions (missing comma?)'),
-    ]
-    
     for line_num, line in enumerate(lines, 1):
-        for pattern, description in patterns_to_check:
-            matches = re.finditer(pattern, line, re.IGNORECASE)
-            for match in matches:
-                issues.append({
-                    'line': line_num,
-                    'position': match.start(),
-                    'text': match.group(0),
-                    'description': description,
-                    'line_content': line.strip()
-                })
+        # Every pattern ends in an opening paren
+        if '(' not in line:
+            continue
+        
+        for pattern_rgx, description in _missing_comma_patterns:
+            for match in pattern_rgx.finditer(line):
+                issues.append(Issue(line_num, match.start(), match.group(0), description, line.strip()))
     
     return issues
 
@@ -53,19 +77,8 @@ def suggest_fixes(formula_text: str) -> str:
     """Suggest fixes for common missing comma patterns."""
     fixed = formula_text
     
-    # Fix common patterns
-    fixes = [
-        # Variable name followed by function call
-        (r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(NOT|AND|OR|IF|SUM|LEN)\s*\(', 
-         r'\1, \2('),
-        
-        # Function followed by another function
-        (r'([A-Z_][A-Z0-9_]*)\s*\(\s*[^)]+\)\s*(NOT|AND|OR|IF|SUM|LEN)\s*\(', 
-         r'\1(...), \2('),  # Simplified - would need more complex logic for real fixes
-    ]
-    
-    for pattern, replacement in fixes:
-        fixed = re.sub(pattern, replacement, fixed, flags=re.IGNORECASE)
+    for pattern_rgx, replacement in _missing_comma_fixes:
+        fixed = pattern_rgx.sub(replacement, fixed)
     
     return fixed
 
@@ -93,10 +106,10 @@ def main():
         print()
         
         for i, issue in enumerate(issues, 1):
-            print(f"{i}. Line {issue['line']}, position {issue['position']}:")
-            print(f"   Pattern: {issue['text']}")
-            print(f"   Issue: {issue['description']}")
-            print(f"   Context: ...{issue['line_content'][max(0, issue['position']-20):issue['position']+40]}...")
+            print(f"{i}. Line {issue.line}, position {issue.position}:")
+            print(f"   Pattern: {issue.text}")
+            print(f"   Issue: {issue.description}")
+            print(f"   Context: ...{issue.line_content[max(0, issue.position-20):issue.position+40]}...")
             print()
     else:
         print("✅ No obvious missing comma patterns detected")
@@ -108,20 +121,25 @@ def main():
         'has_Paid_DateNOT( has_Price )',
     ]
     
+    # Lines are compared with blanks removed, so strip the literals the same
+    # way and match them all in one pass
+    problematic_rgx = re.compile('|'.join(
+        re.escape(prob) for prob in dict.fromkeys(
+            prob.translate(_blank_deletion_table) for prob in problematic_lines)))
+    
     print("\nKnown problematic patterns in paste.txt:")
     print("-" * 40)
     
     for line in formula_content.split('\n'):
-        for prob in problematic_lines:
-            if prob in line.replace(' ', ''):
-                print(f"❌ {line.strip()}")
-                # Show what it should be
-                suggested = line
-                suggested = suggested.replace('has_Paid_DateNOT', 'has_Paid_Date, NOT')
-                suggested = suggested.replace(')NOT(', '), NOT(')
-                if suggested != line:
-                    print(f"✅ Should be: {suggested.strip()}")
-                print()
+        if problematic_rgx.search(line.translate(_blank_deletion_table)):
+            print(f"❌ {line.strip()}")
+            # Show what it should be
+            suggested = line
+            suggested = suggested.replace('has_Paid_DateNOT', 'has_Paid_Date, NOT')
+            suggested = suggested.replace(')NOT(', '), NOT(')
+            if suggested != line:
+                print(f"✅ Should be: {suggested.strip()}")
+            print()
     
     return 0
 
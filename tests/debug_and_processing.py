@@ -12,7 +12,7 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import T_FUNC, get_formatter, name_token_types
 
 
 def debug_and_processing():
@@ -37,24 +37,24 @@ def debug_and_processing():
         original_commas = test_case.count(',')
         print(f"Original comma count: {original_commas}")
         
+        if test_case.startswith('='):
+            clean_formula = test_case[1:]  # Remove =
+        else:
+            clean_formula = test_case
+        
         for mode in ['j', 'a', 'p']:
             print(f"\nMode {mode}:")
             
             try:
-                formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+                formatter = get_formatter(mode)
                 
                 # Step 1: Parse tokens
-                if test_case.startswith('='):
-                    clean_formula = test_case[1:]  # Remove =
-                else:
-                    clean_formula = test_case
-                
                 tokens = formatter._parse_excel_tokens(clean_formula)
                 print(f"  Tokens parsed: {len(tokens)}")
                 
                 # Count commas in tokens
-                comma_tokens = [t for t in tokens if t[1] == ',']
-                print(f"  Comma tokens found: {len(comma_tokens)}")
+                comma_count = sum(1 for t in tokens if t[1] == ',')
+                print(f"  Comma tokens found: {comma_count}")
                 
                 # Step 2: Fold
                 folded = formatter.fold_formula(test_case)
@@ -86,7 +86,7 @@ def debug_token_splitting():
     print("=" * 40)
     
     # Create a formatter to access the internal method
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     # Test the problematic AND pattern
     test_formula = 'AND(has_Paid_Date,NOT(has_Price),has_Invoice_Date)'
@@ -95,14 +95,14 @@ def debug_token_splitting():
     
     # Parse tokens
     tokens = formatter._parse_excel_tokens(test_formula)
-    print(f"All tokens: {tokens}")
+    print(f"All tokens: {name_token_types(tokens)}")
     
     # Find the AND function and extract its arguments
     for i, (token_type, token_text) in enumerate(tokens):
-        if token_type == 'function' and token_text.upper() == 'AND':
+        if token_type == T_FUNC and token_text.upper() == 'AND':
             if i + 1 < len(tokens) and tokens[i + 1][1] == '(':
                 arg_tokens, end_index = formatter._extract_function_arguments(tokens, i + 1)
-                print(f"AND arguments tokens: {arg_tokens}")
+                print(f"AND arguments tokens: {name_token_types(arg_tokens)}")
                 
                 # Split by commas
                 argument_groups = formatter._split_by_top_level_commas(arg_tokens)
@@ -110,7 +110,7 @@ def debug_token_splitting():
                 
                 for j, group in enumerate(argument_groups):
                     group_text = formatter._tokens_to_string(group)
-                    print(f"  Group {j + 1}: {group} → '{group_text}'")
+                    print(f"  Group {j + 1}: {name_token_types(group)} → '{group_text}'")
                 
                 break
 
@@ -120,7 +120,7 @@ def debug_natural_wrapping():
     print("\n\nDebug Natural Wrapping Logic")
     print("=" * 35)
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     # Test a case that would trigger natural wrapping
     long_and = 'AND(has_Paid_Date,NOT(has_Price),has_Invoice_Date,has_Title_Date,has_WBL_Date)'
@@ -133,8 +133,10 @@ def debug_natural_wrapping():
         unfolded = formatter.unfold_formula(folded)
         
         print(f"Original commas: {original_commas}")
-        print(f"Folded commas: {folded.count(',')}")
-        print(f"Unfolded commas: {unfolded.count(',')}")
+        folded_commas = folded.count(',')
+        unfolded_commas = unfolded.count(',')
+        print(f"Folded commas: {folded_commas}")
+        print(f"Unfolded commas: {unfolded_commas}")
         
         print(f"\nFolded result:")
         for line in folded.split('\n'):
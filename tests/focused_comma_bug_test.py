@@ -17,9 +17,9 @@ def manual_test_splitting():
     print("=" * 45)
     
     # Import the formatter to access internal methods
-    from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+    from excel_formula_formatter.modular_excel_formatter import get_formatter, name_token_types
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     # Test the exact problematic case
     test_text = 'has_Paid_Date,NOT(has_Price),has_Invoice_Date'
@@ -28,7 +28,7 @@ def manual_test_splitting():
     
     # Step 1: Parse tokens
     tokens = formatter._parse_excel_tokens(test_text)
-    print(f"\nStep 1 - Tokens: {tokens}")
+    print(f"\nStep 1 - Tokens: {name_token_types(tokens)}")
     comma_tokens = [i for i, (t_type, t_text) in enumerate(tokens) if t_text == ',']
     print(f"Comma token positions: {comma_tokens}")
     
@@ -36,7 +36,7 @@ def manual_test_splitting():
     groups = formatter._split_by_top_level_commas(tokens)
     print(f"\nStep 2 - Split into {len(groups)} groups:")
     for i, group in enumerate(groups):
-        print(f"  Group {i+1}: {group}")
+        print(f"  Group {i+1}: {name_token_types(group)}")
     
     # Step 3: Convert back to strings
     arg_strings = []
@@ -61,9 +61,9 @@ def test_and_natural_wrapping():
     print("\n\nTesting AND Natural Wrapping")
     print("=" * 35)
     
-    from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+    from excel_formula_formatter.modular_excel_formatter import get_formatter
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     # Test cases that should trigger different wrapping behaviors
     test_cases = [
@@ -116,9 +116,9 @@ def test_step_by_step_and():
     print("\n\nStep-by-Step AND Processing")
     print("=" * 35)
     
-    from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+    from excel_formula_formatter.modular_excel_formatter import T_FUNC, get_formatter, name_token_types
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     test_formula = '=AND(has_Paid_Date,NOT(has_Price),has_Invoice_Date)'
     print(f"Formula: {test_formula}")
@@ -127,21 +127,21 @@ def test_step_by_step_and():
     clean_formula = test_formula[1:]  # Remove =
     all_tokens = formatter._parse_excel_tokens(clean_formula)
     
-    print(f"All tokens: {all_tokens}")
+    print(f"All tokens: {name_token_types(all_tokens)}")
     
     # Find the AND function
     for i, (token_type, token_text) in enumerate(all_tokens):
-        if token_type == 'function' and token_text.upper() == 'AND':
+        if token_type == T_FUNC and token_text.upper() == 'AND':
             print(f"\nFound AND at position {i}")
             
             # Extract its arguments
             if i + 1 < len(all_tokens) and all_tokens[i + 1][1] == '(':
                 arg_tokens, end_index = formatter._extract_function_arguments(all_tokens, i + 1)
-                print(f"AND argument tokens: {arg_tokens}")
+                print(f"AND argument tokens: {name_token_types(arg_tokens)}")
                 
                 # Count commas in original tokens
-                original_comma_tokens = [t for t in arg_tokens if t[1] == ',']
-                print(f"Original comma tokens in AND: {len(original_comma_tokens)}")
+                original_comma_count = sum(1 for t in arg_tokens if t[1] == ',')
+                print(f"Original comma tokens in AND: {original_comma_count}")
                 
                 # Process through the logical function handler
                 try:
@@ -155,7 +155,7 @@ def test_step_by_step_and():
                     result_commas = result_text.count(',')
                     print(f"Result comma count: {result_commas}")
                     
-                    if result_commas != len(original_comma_tokens):
+                    if result_commas != original_comma_count:
                         print(f"❌ LOGICAL FUNCTION PROCESSING LOST COMMAS!")
                     else:
                         print(f"✅ Logical function processing preserved commas")
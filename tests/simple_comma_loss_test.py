@@ -11,7 +11,7 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
 
 
 def test_specific_comma_loss():
@@ -23,15 +23,16 @@ def test_specific_comma_loss():
     print("Testing Specific Comma Loss Pattern")
     print("=" * 45)
     print(f"Pattern: {problematic_pattern}")
-    print(f"Original commas: {problematic_pattern.count(',')}")
+    original_commas = problematic_pattern.count(',')
+    print(f"Original commas: {original_commas}")
     print()
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     try:
         folded = formatter.fold_formula(problematic_pattern)
         print("Folded result:")
-        for i, line in enumerate(folded.split('\n'), 1):
+        for i, line in enumerate(folded.splitlines(), 1):
             if line.strip():
                 comma_count = line.count(',')
                 print(f"  {i:2d}: {line} (commas: {comma_count})")
@@ -41,9 +42,10 @@ def test_specific_comma_loss():
         
         unfolded = formatter.unfold_formula(folded)
         print(f"Unfolded: {unfolded}")
-        print(f"Unfolded commas: {unfolded.count(',')}")
+        unfolded_commas = unfolded.count(',')
+        print(f"Unfolded commas: {unfolded_commas}")
         
-        if unfolded.count(',') != problematic_pattern.count(','):
+        if unfolded_commas != original_commas:
             print("❌ COMMA LOSS CONFIRMED!")
         else:
             print("✅ Commas preserved")
@@ -61,21 +63,24 @@ def test_progressive_loss():
     print("=" * 25)
     print(f"Starting with: {pattern}")
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     current = pattern
+    current_commas = original_commas = pattern.count(',')
     
     for cycle in range(3):
         try:
             folded = formatter.fold_formula(current)
             unfolded = formatter.unfold_formula(folded)
             
-            print(f"Cycle {cycle + 1}: {current.count(',')} → {unfolded.count(',')}")
+            unfolded_commas = unfolded.count(',')
+            print(f"Cycle {cycle + 1}: {current_commas} → {unfolded_commas}")
             
-            if unfolded.count(',') != pattern.count(','):
+            if unfolded_commas != original_commas:
                 print(f"  ❌ Lost commas: {unfolded}")
                 break
             
             current = unfolded
+            current_commas = unfolded_commas
             
         except Exception as e:
             print(f"  ERROR: {e}")
@@ -11,7 +11,7 @@ from pathlib import Path
 package_parent = Path(__file__).parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
 
 
 def trace_comma_loss():
@@ -23,7 +23,8 @@ def trace_comma_loss():
     print("Simple Comma Loss Trace")
     print("=" * 30)
     print(f"Testing: {problem_formula}")
-    print(f"Original commas: {problem_formula.count(',')}")
+    original_commas = problem_formula.count(',')
+    print(f"Original commas: {original_commas}")
     print()
     
     for mode in ['j', 'a', 'p']:
@@ -31,25 +32,25 @@ def trace_comma_loss():
         print("-" * 10)
         
         try:
-            formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+            formatter = get_formatter(mode)
             
             # Step by step
-            print(f"1. Original: {problem_formula} (commas: {problem_formula.count(',')})")
+            print(f"1. Original: {problem_formula} (commas: {original_commas})")
             
             folded = formatter.fold_formula(problem_formula)
             print(f"2. Folded commas: {folded.count(',')}")
             
             # Show folded result
-            folded_lines = folded.split('\n')
-            for i, line in enumerate(folded_lines):
+            for i, line in enumerate(folded.splitlines(), 1):
                 if line.strip():
-                    print(f"   Line {i+1}: {line}")
+                    print(f"   Line {i}: {line}")
             
             unfolded = formatter.unfold_formula(folded)
-            print(f"3. Unfolded: {unfolded} (commas: {unfolded.count(',')})")
+            unfolded_commas = unfolded.count(',')
+            print(f"3. Unfolded: {unfolded} (commas: {unfolded_commas})")
             
-            if unfolded.count(',') != problem_formula.count(','):
-                print(f"   ❌ LOST {problem_formula.count(',') - unfolded.count(',')} COMMAS!")
+            if unfolded_commas != original_commas:
+                print(f"   ❌ LOST {original_commas - unfolded_commas} COMMAS!")
             else:
                 print(f"   ✅ All commas preserved")
             
@@ -75,7 +76,7 @@ def test_simple_cases():
     print("Progressive Complexity Test")
     print("=" * 35)
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')  # Use plain mode
+    formatter = get_formatter('p')  # Use plain mode
     
     for i, test in enumerate(test_cases, 1):
         original_commas = test.count(',')
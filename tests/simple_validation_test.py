@@ -11,7 +11,7 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
 
 
 def main():
@@ -33,7 +33,7 @@ def main():
         print("-" * 25)
         
         try:
-            formatter = ModularExcelFormatter.create_formatter_by_mode(mode_code)
+            formatter = get_formatter(mode_code)
             folded = formatter.fold_formula(original)
             unfolded = formatter.unfold_formula(folded)
             
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test that the comma diagnostic tool reports every category of suspect pattern.
+File: tests/test_comma_diagnostic_tool.py
+"""
+
+import sys
+
+from collections import Counter
+from pathlib import Path
+
+# The diagnostic tool lives next to this file
+sys.path.insert(0, str(Path(__file__).parent))
+
+from comma_diagnostic_tool import find_missing_commas, suggest_fixes
+
+
+func_func = 'Function name followed by another function (missing comma?)'
+cell_func = 'Cell reference followed by function (missing comma?)'
+paren_func = 'Function call followed by another function (missing comma?)'
+var_func = 'Variable followed by function (missing comma?)'
+not_not = 'Multiple NOT functions (missing comma?)'
+
+
+def issue_counts(formula_text: str) -> Counter:
+    """Count the reported issues per description."""
+    return Counter(issue.description for issue in find_missing_commas(formula_text))
+
+
+def test_multiple_not_functions():
+    """Test that back-to-back NOT calls hit every overlapping pattern."""
+    counts = issue_counts('NOT( has_Paid_Date )NOT( has_WBL_Date )')
+    expected = Counter({func_func: 2, paren_func: 1, not_not: 1})
+    
+    print(f"NOT/NOT issue counts: {dict(counts)}")
+    success = counts == expected
+    print(f"Counts match: {success}")
+    return success
+
+
+def test_cell_reference_before_function():
+    """Test that a cell reference before a function is reported in all its categories."""
+    counts = issue_counts('A1 SUM(B1)')
+    expected = Counter({func_func: 1, cell_func: 1, var_func: 1})
+    
+    print(f"Cell/function issue counts: {dict(counts)}")
+    success = counts == expected
+    print(f"Counts match: {success}")
+    return success
+
+
+def test_variable_before_function():
+    """Test that a LET variable before a checked function is reported twice."""
+    counts = issue_counts('total IF(x)')
+    expected = Counter({func_func: 1, var_func: 1})
+    
+    print(f"Variable/function issue counts: {dict(counts)}")
+    success = counts == expected
+    print(f"Counts match: {success}")
+    return success
+
+
+def test_issue_lines_and_positions():
+    """Test that issues on later lines report their own line and column."""
+    issues = find_missing_commas('IF(A1>0, x, y)\nfoo bar(1)')
+    located = [(issue.line, issue.position, issue.text) for issue in issues]
+    expected = [(1, 0, 'IF('), (2, 0, 'foo bar(')]
+    
+    print(f"Located issues: {located}")
+    success = located == expected
+    print(f"Locations match: {success}")
+    return success
+
+
+def test_suggest_fixes():
+    """Test that the variable/function fix inserts the missing comma."""
+    fixed = suggest_fixes('has_Paid_DateNOT( has_Price )')
+    
+    print(f"Fixed: {fixed}")
+    success = fixed == 'has_Paid_Date, NOT( has_Price )'
+    print(f"Fix correct: {success}")
+    return success
+
+
+def main():
+    """Run all comma diagnostic tool tests."""
+    print("Comma Diagnostic Tool Tests")
+    print("=" * 40)
+    print()
+    
+    tests = [
+        ("Multiple NOT Functions", test_multiple_not_functions),
+        ("Cell Reference Before Function", test_cell_reference_before_function),
+        ("Variable Before Function", test_variable_before_function),
+        ("Issue Lines and Positions", test_issue_lines_and_positions),
+        ("Suggested Fixes", test_suggest_fixes),
+    ]
+    
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"Running {test_name} test...")
+        print("-" * 40)
+        try:
+            success = test_func()
+            passed += success
+            print(f"✓ {test_name}: {'PASS' if success else 'FAIL'}")
+        except Exception as e:
+            print(f"✗ {test_name}: ERROR - {e}")
+        print()
+    
+    # Final summary
+    total = len(tests)
+    
+    print("=" * 40)
+    print(f"Diagnostic Tool Test Results: {passed}/{total} tests passed")
+    
+    if passed == total:
+        print("🎉 All diagnostic tool tests passed!")
+        return 0
+    else:
+        print("❌ Some diagnostic tool tests failed. Check the output above for details.")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
+
+# End of file #
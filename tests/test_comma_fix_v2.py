@@ -11,7 +11,7 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
 
 
 def test_exact_user_pattern():
@@ -32,7 +32,7 @@ def test_exact_user_pattern():
     print("Testing Exact User Patterns for Comma Loss")
     print("=" * 50)
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     for i, pattern in enumerate(problem_patterns, 1):
         print(f"\nPattern {i}: {pattern}")
@@ -43,12 +43,14 @@ def test_exact_user_pattern():
             folded = formatter.fold_formula(pattern)
             
             print("Folded output:")
-            for line_num, line in enumerate(folded.split('\n'), 1):
-                if line.strip():
+            folded_lines = []
+            for line_num, line in enumerate(folded.splitlines(), 1):
+                stripped = line.strip()
+                if stripped:
                     print(f"  {line_num:2d}: {line}")
+                    folded_lines.append(stripped)
             
             # Check for the specific issue: missing comma after first line
-            folded_lines = [line.strip() for line in folded.split('\n') if line.strip()]
             first_content_line = None
             for line in folded_lines:
                 if 'AND(' in line:
@@ -93,17 +95,17 @@ def test_simple_debugging_case():
     
     print(f"Testing: {simple}")
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
     try:
         folded = formatter.fold_formula(simple)
         
         print("Folded result:")
-        lines = folded.split('\n')
-        for i, line in enumerate(lines, 1):
-            if line.strip():
-                commas_in_line = line.count(',')
-                print(f"  {i}: {line.strip()} (commas: {commas_in_line})")
+        for i, line in enumerate(folded.splitlines(), 1):
+            stripped = line.strip()
+            if stripped:
+                commas_in_line = stripped.count(',')
+                print(f"  {i}: {stripped} (commas: {commas_in_line})")
         
         total_commas = folded.count(',')
         original_commas = simple.count(',')
@@ -10,7 +10,8 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.excel_formula_patterns import whitespace_newline_rgx
+from excel_formula_formatter.modular_excel_formatter import get_formatter
 
 
 def test_comma_fix():
@@ -28,22 +29,25 @@ def test_comma_fix():
         '=IF(AND(has_Paid_Date,NOT(has_Price)),Result1,Result2)',
     ]
     
+    # Comma counts of the inputs do not depend on the mode
+    cases_with_commas = [(test_case, test_case.count(',')) for test_case in test_cases]
+    
     for mode in ['j', 'a', 'p']:
         print(f"\nTesting Mode {mode}:")
         print("-" * 20)
         
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+        formatter = get_formatter(mode)
+        fold_formula = formatter.fold_formula
+        unfold_formula = formatter.unfold_formula
         
-        for i, test_case in enumerate(test_cases, 1):
-            original_commas = test_case.count(',')
-            
+        for i, (test_case, original_commas) in enumerate(cases_with_commas, 1):
             try:
                 # Test multiple fold/unfold cycles
                 current_formula = test_case
                 
                 for cycle in range(3):  # Test 3 cycles
-                    folded = formatter.fold_formula(current_formula)
-                    unfolded = formatter.unfold_formula(folded)
+                    folded = fold_formula(current_formula)
+                    unfolded = unfold_formula(folded)
                     
                     if cycle == 0:  # Show first cycle details
                         folded_commas = folded.count(',')
@@ -56,6 +60,10 @@ def test_comma_fix():
                         if unfolded_commas != original_commas:
                             print(f"     Result: {unfolded}")
                     
+                    # A round-trip that returns its input will repeat forever
+                    if unfolded == current_formula:
+                        break
+                    
                     current_formula = unfolded
                 
                 # Final check after 3 cycles
@@ -87,22 +95,24 @@ def test_specific_user_case():
     )'''
     
     # Convert to single line for testing
-    single_line = ' '.join(line.strip() for line in user_formula.split('\n') if line.strip())
+    single_line = whitespace_newline_rgx.sub(' ', user_formula).strip()
     original_commas = single_line.count(',')
     
     print(f"Original comma count: {original_commas}")
     
     for mode in ['p']:  # Focus on plain mode since that's where user saw the issue
         print(f"\nMode {mode}:")
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+        formatter = get_formatter(mode)
+        fold_formula = formatter.fold_formula
+        unfold_formula = formatter.unfold_formula
         
         try:
             # Test progressive corruption
             current_formula = single_line
             
             for cycle in range(5):
-                folded = formatter.fold_formula(current_formula)
-                unfolded = formatter.unfold_formula(folded)
+                folded = fold_formula(current_formula)
+                unfolded = unfold_formula(folded)
                 current_commas = unfolded.count(',')
                 
                 print(f"  Cycle {cycle + 1}: {current_commas} commas {'✅' if current_commas == original_commas else '❌'}")
@@ -111,6 +121,11 @@ def test_specific_user_case():
                     print(f"    Lost {original_commas - current_commas} commas!")
                     break
                 
+                # A round-trip that returns its input will repeat forever
+                if unfolded == current_formula:
+                    print(f"  Stable from cycle {cycle + 1}")
+                    break
+                
                 current_formula = unfolded
             
         except Exception as e:
@@ -13,6 +13,14 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter import ExcelFormulaFormatter
+from excel_formula_formatter.modular_excel_formatter import T_STRING, get_formatter, _tokenize_formula
+
+
+def formulas_match(original: str, unfolded: str) -> bool:
+    """Compare two formulas, ignoring a leading '=' and spaces."""
+    original = original.removeprefix('=')
+    unfolded = unfolded.removeprefix('=')
+    return original == unfolded or original.replace(' ', '') == unfolded.replace(' ', '')
 
 
 def test_array_formulas():
@@ -29,7 +37,7 @@ def test_array_formulas():
     print()
     
     # For array formulas, compare directly after normalizing spaces
-    success = original.replace(' ', '') == unfolded.replace(' ', '')
+    success = formulas_match(original, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -47,10 +55,7 @@ def test_structured_references():
     print(f"Unfolded: {unfolded}")
     print()
     
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    success = formulas_match(original, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -68,10 +73,7 @@ def test_quoted_sheet_names():
     print(f"Unfolded: {unfolded}")
     print()
     
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    success = formulas_match(original, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -89,14 +91,75 @@ def test_nested_quotes():
     print(f"Unfolded: {unfolded}")
     print()
     
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
+    success = formulas_match(original, unfolded)
+    print(f"Round-trip success: {success}")
+    return success
+
+
+def test_doubled_quote_tokens():
+    """Test that both tokenizers keep a doubled quote inside one string literal."""
+    formula = 'IF(A1="x""y","",2)'
+    expected = ['"x""y"', '""']
+    
+    legacy_strings = [text for kind, text in ExcelFormulaFormatter()._parse_excel_tokens(formula)
+                        if kind == 'string']
+    modular_strings = [text for kind, text in _tokenize_formula(formula) if kind == T_STRING]
+    
+    print(f"Legacy string tokens: {legacy_strings}")
+    print(f"Modular string tokens: {modular_strings}")
+    print()
+    
+    success = legacy_strings == expected and modular_strings == expected
+    print(f"One token per literal: {success}")
+    return success
+
+
+def test_doubled_quote_round_trip():
+    """Test that literals with doubled quotes survive a round-trip in every mode."""
+    original = '=IF(A1="",B1&"""",SUBSTITUTE(C1,"""",""""""))'
+    
+    success = True
+    for mode in 'jacp':
+        formatter = get_formatter(mode)
+        unfolded = formatter.unfold_formula(formatter.fold_formula(original))
+        mode_success = formulas_match(original, unfolded)
+        print(f"Mode {mode}: {unfolded} ({'OK' if mode_success else 'MISMATCH'})")
+        success = success and mode_success
     
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    print()
     print(f"Round-trip success: {success}")
     return success
 
 
+def test_doubled_quote_case_pairs():
+    """Test that a doubled quote does not add legacy CASE/RESULT PAIR separators."""
+    formatter = ExcelFormulaFormatter()
+    
+    # Each literal is one token, so the separators match the same formula without the escape
+    pairs = [
+        ('=IFS(A1="",1,B1="x""y",2)', '=IFS(A1="",1,B1="xy",2)'),
+        ('=SWITCH(A1,"a""b",1,"c",2,0)', '=SWITCH(A1,"ab",1,"c",2,0)'),
+    ]
+    
+    success = True
+    for escaped, plain in pairs:
+        folded = formatter.fold_formula(escaped)
+        unfolded = formatter.unfold_formula(folded)
+        separators = folded.count('CASE/RESULT PAIR')
+        plain_separators = formatter.fold_formula(plain).count('CASE/RESULT PAIR')
+        
+        print(f"Original: {escaped}")
+        print(f"Folded:\n{folded}")
+        print(f"Unfolded: {unfolded}")
+        print(f"Separators: {separators} (without escape: {plain_separators})")
+        print()
+        
+        success = success and separators == plain_separators and unfolded == escaped
+    
+    print(f"Separators unchanged by escapes: {success}")
+    return success
+
+
 def test_percentages_and_scientific():
     """Test percentage and scientific notation."""
     formatter = ExcelFormulaFormatter()
@@ -110,10 +173,7 @@ def test_percentages_and_scientific():
     print(f"Unfolded: {unfolded}")
     print()
     
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    success = formulas_match(original, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -131,10 +191,7 @@ def test_named_ranges():
     print(f"Unfolded: {unfolded}")
     print()
     
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    success = formulas_match(original, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -152,10 +209,7 @@ def test_complex_dynamic_arrays():
     print(f"Unfolded: {unfolded}")
     print()
     
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    success = formulas_match(original, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -171,15 +225,12 @@ def test_very_long_formula():
     unfolded = formatter.unfold_formula(folded)
     
     print(f"Original length: {len(nested_formula)} characters")
-    print(f"Folded lines: {len(folded.split(chr(10)))}")  # Use chr(10) instead of escaped newline
+    print(f"Folded lines: {folded.count(chr(10)) + 1}")  # Use chr(10) instead of escaped newline
     print(f"Folded preview:\n{folded[:200]}...")
     print(f"Unfolded: {unfolded[:100]}..." if len(unfolded) > 100 else f"Unfolded: {unfolded}")
     print()
     
-    original_norm = nested_formula[1:] if nested_formula.startswith('=') else nested_formula
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    
-    success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    success = formulas_match(nested_formula, unfolded)
     print(f"Round-trip success: {success}")
     return success
 
@@ -195,6 +246,9 @@ def main():
         ("Structured References", test_structured_references), 
         ("Quoted Sheet Names", test_quoted_sheet_names),
         ("Nested Quotes", test_nested_quotes),
+        ("Doubled Quote Tokens", test_doubled_quote_tokens),
+        ("Doubled Quote Round-Trip", test_doubled_quote_round_trip),
+        ("Doubled Quote Case Pairs", test_doubled_quote_case_pairs),
         ("Percentages & Scientific", test_percentages_and_scientific),
         ("Named Ranges", test_named_ranges),
         ("Dynamic Arrays", test_complex_dynamic_arrays),
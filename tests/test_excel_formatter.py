@@ -15,15 +15,19 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter.excel_formula_formatter import ExcelFormulaFormatter
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
 
 
 def normalize_formula(formula: str) -> str:
     """Normalize Excel formula for comparison by removing leading = and spaces."""
-    normalized = formula.strip()
-    if normalized.startswith('='):
-        normalized = normalized[1:]
-    return normalized.replace(' ', '')
+    return formula.strip().removeprefix('=').replace(' ', '')
+
+
+def round_trip(formatter, original: str):
+    """Fold then unfold a formula; return both texts and whether it came back intact."""
+    folded = formatter.fold_formula(original)
+    unfolded = formatter.unfold_formula(folded)
+    return folded, unfolded, normalize_formula(original) == normalize_formula(unfolded)
 
 
 def test_simple_sum():
@@ -31,29 +35,18 @@ def test_simple_sum():
     original = "=SUM(A1:A10)"
     
     print("Testing with Original Formatter:")
-    original_formatter = ExcelFormulaFormatter()
+    folded_orig, unfolded_orig, original_success = round_trip(ExcelFormulaFormatter(), original)
     
-    folded_orig = original_formatter.fold_formula(original)
-    unfolded_orig = original_formatter.unfold_formula(folded_orig)
+    print(f"Original: {original}\nFolded (Original):\n{folded_orig}\nUnfolded (Original): {unfolded_orig}")
     
-    print(f"Original: {original}")
-    print(f"Folded (Original):\n{folded_orig}")
-    print(f"Unfolded (Original): {unfolded_orig}")
-    
-    original_success = normalize_formula(original) == normalize_formula(unfolded_orig)
     print(f"Original formatter success: {original_success}")
     print()
     
     print("Testing with Modular Formatter:")
-    modular_formatter = ModularExcelFormatter.create_javascript_formatter()
+    folded_mod, unfolded_mod, modular_success = round_trip(get_formatter('j'), original)
     
-    folded_mod = modular_formatter.fold_formula(original)
-    unfolded_mod = modular_formatter.unfold_formula(folded_mod)
+    print(f"Folded (Modular):\n{folded_mod}\nUnfolded (Modular): {unfolded_mod}")
     
-    print(f"Folded (Modular):\n{folded_mod}")
-    print(f"Unfolded (Modular): {unfolded_mod}")
-    
-    modular_success = normalize_formula(original) == normalize_formula(unfolded_mod)
     print(f"Modular formatter success: {modular_success}")
     print()
     
@@ -67,29 +60,18 @@ def test_complex_if_formula():
     original = '=IF(A1>B$2,SUM(A1:A10)*Sheet1!C1,"")'
     
     print("Testing with Original Formatter:")
-    original_formatter = ExcelFormulaFormatter()
-    
-    folded_orig = original_formatter.fold_formula(original)
-    unfolded_orig = original_formatter.unfold_formula(folded_orig)
+    folded_orig, unfolded_orig, original_success = round_trip(ExcelFormulaFormatter(), original)
     
-    print(f"Original: {original}")
-    print(f"Folded (Original):\n{folded_orig}")
-    print(f"Unfolded (Original): {unfolded_orig}")
+    print(f"Original: {original}\nFolded (Original):\n{folded_orig}\nUnfolded (Original): {unfolded_orig}")
     
-    original_success = normalize_formula(original) == normalize_formula(unfolded_orig)
     print(f"Original formatter success: {original_success}")
     print()
     
     print("Testing with Modular Formatter:")
-    modular_formatter = ModularExcelFormatter.create_javascript_formatter()
+    folded_mod, unfolded_mod, modular_success = round_trip(get_formatter('j'), original)
     
-    folded_mod = modular_formatter.fold_formula(original)
-    unfolded_mod = modular_formatter.unfold_formula(folded_mod)
+    print(f"Folded (Modular):\n{folded_mod}\nUnfolded (Modular): {unfolded_mod}")
     
-    print(f"Folded (Modular):\n{folded_mod}")
-    print(f"Unfolded (Modular): {unfolded_mod}")
-    
-    modular_success = normalize_formula(original) == normalize_formula(unfolded_mod)
     print(f"Modular formatter success: {modular_success}")
     print()
     
@@ -103,21 +85,15 @@ def test_not_equal_operator():
     original = '=IF(A1<>B1,"Different","Same")'
     
     print("Testing with Original Formatter:")
-    original_formatter = ExcelFormulaFormatter()
-    
-    folded_orig = original_formatter.fold_formula(original)
-    unfolded_orig = original_formatter.unfold_formula(folded_orig)
+    folded_orig, unfolded_orig, round_trip_success_orig = round_trip(ExcelFormulaFormatter(), original)
     
-    print(f"Original: {original}")
-    print(f"Folded (Original):\n{folded_orig}")
-    print(f"Unfolded (Original): {unfolded_orig}")
+    print(f"Original: {original}\nFolded (Original):\n{folded_orig}\nUnfolded (Original): {unfolded_orig}")
     
     # Check that folded version contains != 
     has_js_operator_orig = '!=' in folded_orig
     # Check that unfolded version contains <>
     has_excel_operator_orig = '<>' in unfolded_orig
     
-    round_trip_success_orig = normalize_formula(original) == normalize_formula(unfolded_orig)
     original_success = has_js_operator_orig and has_excel_operator_orig and round_trip_success_orig
     
     print(f"Has != in folded: {has_js_operator_orig}")
@@ -127,18 +103,13 @@ def test_not_equal_operator():
     print()
     
     print("Testing with Modular Formatter:")
-    modular_formatter = ModularExcelFormatter.create_javascript_formatter()
-    
-    folded_mod = modular_formatter.fold_formula(original)
-    unfolded_mod = modular_formatter.unfold_formula(folded_mod)
+    folded_mod, unfolded_mod, round_trip_success_mod = round_trip(get_formatter('j'), original)
     
-    print(f"Folded (Modular):\n{folded_mod}")
-    print(f"Unfolded (Modular): {unfolded_mod}")
+    print(f"Folded (Modular):\n{folded_mod}\nUnfolded (Modular): {unfolded_mod}")
     
     has_js_operator_mod = '!=' in folded_mod
     has_excel_operator_mod = '<>' in unfolded_mod
     
-    round_trip_success_mod = normalize_formula(original) == normalize_formula(unfolded_mod)
     modular_success = has_js_operator_mod and has_excel_operator_mod and round_trip_success_mod
     
     print(f"Has != in folded: {has_js_operator_mod}")
@@ -157,29 +128,21 @@ def test_nested_functions():
     original = '=SUM(IF(ISERROR(VLOOKUP(A1:A10,B:C,2,FALSE)),0,VLOOKUP(A1:A10,B:C,2,FALSE)))'
     
     print("Testing with Original Formatter:")
-    original_formatter = ExcelFormulaFormatter()
-    
-    folded_orig = original_formatter.fold_formula(original)
-    unfolded_orig = original_formatter.unfold_formula(folded_orig)
+    folded_orig, unfolded_orig, original_success = round_trip(ExcelFormulaFormatter(), original)
     
     print(f"Original: {original}")
-    print(f"Folded lines (Original): {len(folded_orig.split(chr(10)))}")
+    print(f"Folded lines (Original): {folded_orig.count(chr(10)) + 1}")
     print(f"Unfolded (Original): {unfolded_orig}")
     
-    original_success = normalize_formula(original) == normalize_formula(unfolded_orig)
     print(f"Original formatter success: {original_success}")
     print()
     
     print("Testing with Modular Formatter:")
-    modular_formatter = ModularExcelFormatter.create_javascript_formatter()
+    folded_mod, unfolded_mod, modular_success = round_trip(get_formatter('j'), original)
     
-    folded_mod = modular_formatter.fold_formula(original)
-    unfolded_mod = modular_formatter.unfold_formula(folded_mod)
-    
-    print(f"Folded lines (Modular): {len(folded_mod.split(chr(10)))}")
+    print(f"Folded lines (Modular): {folded_mod.count(chr(10)) + 1}")
     print(f"Unfolded (Modular): {unfolded_mod}")
     
-    modular_success = normalize_formula(original) == normalize_formula(unfolded_mod)
     print(f"Modular formatter success: {modular_success}")
     print()
     
@@ -194,17 +157,8 @@ def test_string_literals_with_commas():
     
     print("Testing with both formatters (abbreviated output):")
     
-    # Test original
-    original_formatter = ExcelFormulaFormatter()
-    folded_orig = original_formatter.fold_formula(original)
-    unfolded_orig = original_formatter.unfold_formula(folded_orig)
-    original_success = normalize_formula(original) == normalize_formula(unfolded_orig)
-    
-    # Test modular
-    modular_formatter = ModularExcelFormatter.create_javascript_formatter()
-    folded_mod = modular_formatter.fold_formula(original)
-    unfolded_mod = modular_formatter.unfold_formula(folded_mod)
-    modular_success = normalize_formula(original) == normalize_formula(unfolded_mod)
+    original_success = round_trip(ExcelFormulaFormatter(), original)[2]
+    modular_success = round_trip(get_formatter('j'), original)[2]
     
     print(f"Original: {original}")
     print(f"Original formatter success: {original_success}")
@@ -221,7 +175,7 @@ def test_empty_and_edge_cases():
     print("Testing edge cases with both formatters:")
     
     original_formatter = ExcelFormulaFormatter()
-    modular_formatter = ModularExcelFormatter.create_javascript_formatter()
+    modular_formatter = get_formatter('j')
     
     # Test empty input
     empty_result_orig = original_formatter.fold_formula("")
@@ -245,9 +199,9 @@ def test_empty_and_edge_cases():
     print()
     
     original_success = (empty_result_orig == "" and empty_unfolded_orig == "" and
-                       equals_unfolded_orig in ["", "="])
+                       equals_unfolded_orig in ("", "="))
     modular_success = (empty_result_mod == "" and empty_unfolded_mod == "" and
-                      equals_unfolded_mod in ["", "="])
+                      equals_unfolded_mod in ("", "="))
     
     success = original_success and modular_success
     print(f"Original formatter edge cases: {original_success}")
@@ -271,22 +225,20 @@ def main():
         ("Edge Cases", test_empty_and_edge_cases)
     ]
     
-    results = []
+    passed = 0
     for test_name, test_func in tests:
         print(f"Running {test_name} test...")
         print("-" * 50)
         try:
             success = test_func()
-            results.append(success)
+            passed += success
             print(f"✓ {test_name}: {'PASS' if success else 'FAIL'}")
         except Exception as e:
             print(f"✗ {test_name}: ERROR - {e}")
-            results.append(False)
         print()
     
     # Final summary
-    passed = sum(results)
-    total = len(results)
+    total = len(tests)
     
     print("=" * 70)
     print(f"Test Results: {passed}/{total} tests passed")
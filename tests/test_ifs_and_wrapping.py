@@ -13,7 +13,14 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter import ExcelFormulaFormatter
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
+
+
+def formulas_match(original: str, unfolded: str) -> bool:
+    """Compare two formulas, ignoring a leading '=' and spaces."""
+    original = original.removeprefix('=')
+    unfolded = unfolded.removeprefix('=')
+    return original == unfolded or original.replace(' ', '') == unfolded.replace(' ', '')
 
 
 def test_and_natural_wrapping():
@@ -24,10 +31,7 @@ def test_and_natural_wrapping():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check for natural wrapping pattern
     lines = folded.split('\n')
@@ -47,9 +51,7 @@ def test_and_natural_wrapping():
             has_natural_wrap = True
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = has_proper_spacing and round_trip_success
     print(f"Has proper spacing: {has_proper_spacing}")
@@ -67,20 +69,14 @@ def test_simple_ifs():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check for case/result pair separators
-    lines = folded.split('\n')
-    has_pair_separators = any('CASE/RESULT PAIR' in line for line in lines)
-    has_blank_lines = '' in lines  # Should have blank lines between cases
+    has_pair_separators = 'CASE/RESULT PAIR' in folded
+    has_blank_lines = '\n\n' in folded  # Should have blank lines between cases
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = has_pair_separators and has_blank_lines and round_trip_success
     print(f"Has CASE/RESULT PAIR separators: {has_pair_separators}")
@@ -98,25 +94,19 @@ def test_complex_ifs_with_and():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check for case structure
-    lines = folded.split('\n')
-    has_pair_separators = any('CASE/RESULT PAIR' in line for line in lines)
+    has_pair_separators = 'CASE/RESULT PAIR' in folded
     
     # Check that AND functions use natural wrapping (no generic comments)
-    has_logical_and_comment = any('Logical AND' in line for line in lines)
+    has_logical_and_comment = 'Logical AND' in folded
     
     # Check for proper AND spacing
-    has_and_spacing = any('AND(  has_Paid_Date' in line for line in lines)
+    has_and_spacing = 'AND(  has_Paid_Date' in folded
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = (has_pair_separators and 
               not has_logical_and_comment and has_and_spacing and round_trip_success)
@@ -131,25 +121,20 @@ def test_complex_ifs_with_and():
 
 def test_modular_ifs_plain():
     """Test IFS with Plain modular formatter."""
-    formatter = ModularExcelFormatter.create_plain_formatter()
+    formatter = get_formatter('p')
     original = '=IFS(A1>0,"High",A1<0,"Low",TRUE,"Medium")'
     
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check for Plain-style case/result pair separators (using // comments)
     lines = folded.split('\n')
     has_pair_separators = any('CASE/RESULT PAIR' in line and '//' in line for line in lines)
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = has_pair_separators and round_trip_success
     print(f"Has Plain case/result pair separators: {has_pair_separators}")
@@ -166,19 +151,13 @@ def test_switch_function():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check for case/result pair separators in SWITCH
-    lines = folded.split('\n')
-    has_pair_separators = any('CASE/RESULT PAIR' in line for line in lines)
+    has_pair_separators = 'CASE/RESULT PAIR' in folded
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = has_pair_separators and round_trip_success
     print(f"Has CASE/RESULT PAIR separators: {has_pair_separators}")
@@ -201,22 +180,20 @@ def main():
         ("SWITCH Function", test_switch_function)
     ]
     
-    results = []
+    passed = 0
     for test_name, test_func in tests:
         print(f"Running {test_name} test...")
         print("-" * 40)
         try:
             success = test_func()
-            results.append(success)
+            passed += success
             print(f"✓ {test_name}: {'PASS' if success else 'FAIL'}")
         except Exception as e:
             print(f"✗ {test_name}: ERROR - {e}")
-            results.append(False)
         print()
     
     # Final summary
-    passed = sum(results)
-    total = len(results)
+    total = len(tests)
     
     print("=" * 60)
     print(f"Enhancement Test Results: {passed}/{total} tests passed")
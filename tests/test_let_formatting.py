@@ -4,6 +4,7 @@ Test LET function formatting functionality.
 File: tests/test_let_formatting.py
 """
 
+import re
 import sys
 
 from pathlib import Path
@@ -13,7 +14,18 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter import ExcelFormulaFormatter
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
+
+# Matches each line holding at least one of the checked variable/value pairs
+_let_pair_line_rgx = re.compile(
+    r'(?m)^.*?(?:has_Paid_Date|has_Price|has_Invoice_Date), LEN\(.*$')
+
+
+def formulas_match(original: str, unfolded: str) -> bool:
+    """Compare two formulas, ignoring a leading '=' and spaces."""
+    original = original.removeprefix('=')
+    unfolded = unfolded.removeprefix('=')
+    return original == unfolded or original.replace(' ', '') == unfolded.replace(' ', '')
 
 
 def test_simple_let_formula():
@@ -24,25 +36,14 @@ def test_simple_let_formula():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check that variable pairs are on same lines
-    lines = folded.split('\n')
-    
     # Should have: header comment, x,A1 line, y,B1 line, x+y line
-    expected_pattern_found = False
-    for line in lines:
-        if 'x, "A1"' in line:  # Variable name and value on same line
-            expected_pattern_found = True
-            break
+    expected_pattern_found = 'x, "A1"' in folded  # Variable name and value on same line
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = expected_pattern_found and round_trip_success
     print(f"Variable pairs on same line: {expected_pattern_found}")
@@ -59,31 +60,16 @@ def test_complex_let_formula():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check that variable pairs are on same lines
-    lines = folded.split('\n')
-    variable_pairs_correct = 0
-    
-    for line in lines:
-        # Look for variable name, value patterns
-        if 'has_Paid_Date, LEN(' in line:
-            variable_pairs_correct += 1
-        elif 'has_Price, LEN(' in line:
-            variable_pairs_correct += 1
-        elif 'has_Invoice_Date, LEN(' in line:
-            variable_pairs_correct += 1
+    variable_pairs_correct = sum(1 for _ in _let_pair_line_rgx.finditer(folded))
     
     # Should find at least a few variable pairs on same lines
     pairs_found = variable_pairs_correct >= 2
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = pairs_found and round_trip_success
     print(f"Variable pairs found on same lines: {variable_pairs_correct}")
@@ -95,28 +81,22 @@ def test_complex_let_formula():
 
 def test_modular_let_javascript():
     """Test LET function with JavaScript modular formatter."""
-    formatter = ModularExcelFormatter.create_javascript_formatter()
+    formatter = get_formatter('j')
     original = '=LET(x,A1+B1,y,C1*D1,x/y)'
     
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check for variable pairs on same lines (no spaces around operators in this context)
-    lines = folded.split('\n')
-    found_x_pair = any('x, "A1" + "B1"' in line for line in lines)
-    found_y_pair = any('y, "C1" * "D1"' in line for line in lines)
+    found_x_pair = 'x, "A1" + "B1"' in folded
+    found_y_pair = 'y, "C1" * "D1"' in folded
     
     pairs_found = found_x_pair and found_y_pair
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = pairs_found and round_trip_success
     print(f"Found x pair: {found_x_pair}")
@@ -169,22 +149,16 @@ def test_nested_let_formula():
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
-    print(f"Original: {original}")
-    print(f"Folded:\n{folded}")
-    print(f"Unfolded: {unfolded}")
-    print()
+    print(f"Original: {original}\nFolded:\n{folded}\nUnfolded: {unfolded}\n")
     
     # Check that complex expressions stay with their variable names
-    lines = folded.split('\n')
-    found_sum_pair = any('sum_a, SUM(' in line for line in lines)
-    found_avg_pair = any('avg_b, AVERAGE(' in line for line in lines)
+    found_sum_pair = 'sum_a, SUM(' in folded
+    found_avg_pair = 'avg_b, AVERAGE(' in folded
     
     pairs_found = found_sum_pair and found_avg_pair
     
     # Check round-trip
-    original_norm = original[1:] if original.startswith('=') else original
-    unfolded_norm = unfolded[1:] if unfolded.startswith('=') else unfolded
-    round_trip_success = original_norm.replace(' ', '') == unfolded_norm.replace(' ', '')
+    round_trip_success = formulas_match(original, unfolded)
     
     success = pairs_found and round_trip_success
     print(f"Found sum pair: {found_sum_pair}")
@@ -209,22 +183,20 @@ def main():
         ("Nested LET Formula", test_nested_let_formula)
     ]
     
-    results = []
+    passed = 0
     for test_name, test_func in tests:
         print(f"Running {test_name} test...")
         print("-" * 40)
         try:
             success = test_func()
-            results.append(success)
+            passed += success
             print(f"✓ {test_name}: {'PASS' if success else 'FAIL'}")
         except Exception as e:
             print(f"✗ {test_name}: ERROR - {e}")
-            results.append(False)
         print()
     
     # Final summary
-    passed = sum(results)
-    total = len(results)
+    total = len(tests)
     
     print("=" * 50)
     print(f"LET Test Results: {passed}/{total} tests passed")
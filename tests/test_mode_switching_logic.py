@@ -12,10 +12,16 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter.modular_excel_formatter import (
-    ModularExcelFormatter, safe_mode_switch, detect_current_mode
+    get_formatter, safe_mode_switch, detect_current_mode
 )
 
 
+def print_numbered_lines(text: str):
+    """Print the non-blank lines of text with their line numbers, in one write."""
+    sys.stdout.write(''.join(f"  {i}: {line}\n"
+                             for i, line in enumerate(text.split('\n'), 1) if line.strip()))
+
+
 def test_plain_mode_no_comments():
     """Test that plain mode never produces comments."""
     original = '=IF(A1<>B1,SUM(A1:A10),"Equal")'
@@ -24,13 +30,11 @@ def test_plain_mode_no_comments():
     print("=" * 45)
     print(f"Original: {original}")
     
-    plain_formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    plain_formatter = get_formatter('p')
     folded = plain_formatter.fold_formula(original)
     
     print(f"Plain mode folded:")
-    for i, line in enumerate(folded.split('\n'), 1):
-        if line.strip():
-            print(f"  {i}: {line}")
+    print_numbered_lines(folded)
     
     has_comments = '//' in folded
     print(f"\nHas comments: {has_comments}")
@@ -52,7 +56,7 @@ def test_mode_switching_comment_elimination():
     print(f"Original: {original}")
     
     # Start with JavaScript mode (has comments)
-    js_formatter = ModularExcelFormatter.create_formatter_by_mode('j')
+    js_formatter = get_formatter('j')
     js_folded = js_formatter.fold_formula(original)
     
     print(f"\nJavaScript mode folded (should have comments):")
@@ -67,9 +71,7 @@ def test_mode_switching_comment_elimination():
     plain_result = safe_mode_switch(js_folded, 'j', 'p', should_refold=True)
     
     print(f"\nAfter switching to plain mode:")
-    for i, line in enumerate(plain_result.split('\n'), 1):
-        if line.strip():
-            print(f"  {i}: {line}")
+    print_numbered_lines(plain_result)
     
     plain_has_comments = '//' in plain_result
     print(f"\nHas comments after switch: {plain_has_comments}")
@@ -94,7 +96,7 @@ def test_detect_mode_accuracy():
     
     # Test each mode
     for mode, mode_name in [('j', 'JavaScript'), ('a', 'Annotated'), ('p', 'Plain')]:
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+        formatter = get_formatter(mode)
         folded = formatter.fold_formula(original)
         detected = detect_current_mode(folded)
         
@@ -126,7 +128,7 @@ def test_edge_case_comment_leakage():
     
     # Test case 1: JavaScript with complex comments -> Plain
     print(f"Test 1: Complex formula with JavaScript comments -> Plain")
-    js_formatter = ModularExcelFormatter.create_formatter_by_mode('j')
+    js_formatter = get_formatter('j')
     complex_original = '=LET(x,A1+B1,y,C1*D1,IF(x>y,"X wins","Y wins"))'
     print(f"Original: {complex_original}")
     
@@ -146,7 +148,7 @@ def test_edge_case_comment_leakage():
     
     # Test case 2: Annotated with section comments -> Plain  
     print(f"\nTest 2: Annotated with section comments -> Plain")
-    annotated_formatter = ModularExcelFormatter.create_formatter_by_mode('a')
+    annotated_formatter = get_formatter('a')
     ifs_original = '=IFS(A1>0,"High",A1<0,"Low",TRUE,"Medium")'
     
     annotated_folded = annotated_formatter.fold_formula(ifs_original)
@@ -165,7 +167,7 @@ def test_edge_case_comment_leakage():
     
     # Test case 3: Direct PlainExcelTranslator test
     print(f"\nTest 3: Direct PlainExcelTranslator behavior")
-    plain_formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    plain_formatter = get_formatter('p')
     
     test_formulas = [
         '=SUM(A1:A10)',
@@ -200,17 +202,14 @@ def test_round_trip_mode_switching():
     
     # Mode switching sequence: p -> j -> a -> p
     current_text = original
-    modes = ['p', 'j', 'a', 'p']
+    modes = ('p', 'j', 'a', 'p')
     
-    for i in range(len(modes) - 1):
-        from_mode = modes[i]
-        to_mode = modes[i + 1]
-        
+    for i, (from_mode, to_mode) in enumerate(zip(modes, modes[1:])):
         print(f"\nSwitching {from_mode} -> {to_mode}:")
         
         # If starting with unfolded formula, fold it first
         if i == 0 and not ('\n' in current_text or '//' in current_text):
-            formatter = ModularExcelFormatter.create_formatter_by_mode(from_mode)
+            formatter = get_formatter(from_mode)
             current_text = formatter.fold_formula(current_text)
             print(f"  Folded with {from_mode} first")
         
@@ -228,7 +227,7 @@ def test_round_trip_mode_switching():
         current_text = switched_text
     
     # Final unfold and check integrity
-    final_formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    final_formatter = get_formatter('p')
     final_unfolded = final_formatter.unfold_formula(current_text)
     
     # Normalize for comparison
@@ -262,7 +261,7 @@ def main():
         ("Round-Trip Mode Switching", test_round_trip_mode_switching)
     ]
     
-    results = []
+    passed = 0
     for test_name, test_func in tests:
         print(f"Running {test_name} test...")
         print("-" * 50)
@@ -276,16 +275,14 @@ def main():
                 print(f"⚠️ {test_name}: Function returned {type(success)}, converting to bool")
                 success = bool(success)
             
-            results.append(success)
+            passed += success
             print(f"✓ {test_name}: {'PASS' if success else 'FAIL'}")
         except Exception as e:
             print(f"✗ {test_name}: ERROR - {e}")
-            results.append(False)
         print()
     
-    # Safe sum that handles any potential None values
-    passed = sum(1 for result in results if result is True)
-    total = len(results)
+    # Results were coerced to bool above, so passed counts only real passes
+    total = len(tests)
     
     print("=" * 60)
     print(f"Mode Switching Test Results: {passed}/{total} tests passed")
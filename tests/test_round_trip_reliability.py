@@ -13,28 +13,40 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter.modular_excel_formatter import (
-    ModularExcelFormatter, detect_current_mode, safe_mode_switch
+    get_formatter, detect_current_mode, safe_mode_switch
+)
+
+# One formula per Excel operator, with a label for the report
+_operator_cases = (
+    ('=A1+B1', 'Addition'),
+    ('=A1-B1', 'Subtraction'),
+    ('=A1*B1', 'Multiplication'),
+    ('=A1/B1', 'Division'),
+    ('=A1=B1', 'Equality'),
+    ('=A1<>B1', 'Not equal'),
+    ('=A1>B1', 'Greater than'),
+    ('=A1<B1', 'Less than'),
+    ('=A1>=B1', 'Greater equal'),
+    ('=A1<=B1', 'Less equal'),
+    ('=A1&B1', 'Concatenation'),
 )
 
 
 def normalize_formula(formula: str) -> str:
     """Normalize Excel formula for comparison by removing leading = and spaces."""
-    normalized = formula.strip()
-    if normalized.startswith('='):
-        normalized = normalized[1:]
-    return normalized.replace(' ', '')
+    return formula.strip().removeprefix('=').replace(' ', '')
 
 
 def test_javascript_simple_round_trip():
     """Test JavaScript translator simple round-trip."""
-    formatter = ModularExcelFormatter.create_javascript_formatter()
+    formatter = get_formatter('j')
     original = '=SUM(A1:A10,B1:B10)'
     
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
     print(f"Original: {original}")
-    print(f"Folded preview: {folded.split(chr(10))[0]}...")
+    print(f"Folded preview: {folded.partition(chr(10))[0]}...")
     print(f"Unfolded: {unfolded}")
     print()
     
@@ -49,14 +61,14 @@ def test_javascript_simple_round_trip():
 
 def test_javascript_complex_round_trip():
     """Test JavaScript translator with complex nested formula."""
-    formatter = ModularExcelFormatter.create_javascript_formatter()
+    formatter = get_formatter('j')
     original = '=IF(AND(A1>0,B1<>""),SUM(A1:A10),IF(C1>=D1,MAX(E1:E10),"Error"))'
     
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
     print(f"Original: {original}")
-    print(f"Folded lines: {len(folded.split(chr(10)))}")
+    print(f"Folded lines: {folded.count(chr(10)) + 1}")
     print(f"Unfolded: {unfolded}")
     print()
     
@@ -71,7 +83,7 @@ def test_javascript_complex_round_trip():
 
 def test_javascript_idempotency():
     """Test JavaScript translator idempotency (fold→unfold→fold produces same result)."""
-    formatter = ModularExcelFormatter.create_javascript_formatter()
+    formatter = get_formatter('j')
     original = '=LET(x,A1+B1,y,C1*D1,IF(x>y,x,y))'
     
     # First cycle
@@ -104,14 +116,14 @@ def test_javascript_idempotency():
 
 def test_plain_simple_round_trip():
     """Test Plain translator simple round-trip."""
-    formatter = ModularExcelFormatter.create_plain_formatter()
+    formatter = get_formatter('p')
     original = '=SUM(A1:A10,B1:B10)'
     
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
     print(f"Original: {original}")
-    print(f"Folded preview: {folded.split(chr(10))[0]}...")
+    print(f"Folded preview: {folded.partition(chr(10))[0]}...")
     print(f"Unfolded: {unfolded}")
     print()
     
@@ -126,14 +138,14 @@ def test_plain_simple_round_trip():
 
 def test_plain_complex_round_trip():
     """Test Plain translator with complex operators and functions."""
-    formatter = ModularExcelFormatter.create_plain_formatter()
+    formatter = get_formatter('p')
     original = '=IF(A1<>B1,CONCATENATE("Different: ",A1," vs ",B1),AND(A1>=0,B1<=100))'
     
     folded = formatter.fold_formula(original)
     unfolded = formatter.unfold_formula(folded)
     
     print(f"Original: {original}")
-    print(f"Folded lines: {len(folded.split(chr(10)))}")
+    print(f"Folded lines: {folded.count(chr(10)) + 1}")
     print(f"Unfolded: {unfolded}")
     print()
     
@@ -148,7 +160,7 @@ def test_plain_complex_round_trip():
 
 def test_plain_idempotency():
     """Test Plain translator idempotency."""
-    formatter = ModularExcelFormatter.create_plain_formatter()
+    formatter = get_formatter('p')
     original = '=IF(AND(A1>0,B1<>C1),SUM(A1:A10)&" total",AVERAGE(D1:D10))'
     
     # First cycle
@@ -181,48 +193,31 @@ def test_plain_idempotency():
 
 def test_operators_preservation():
     """Test that all Excel operators are preserved correctly."""
-    test_cases = [
-        ('=A1+B1', 'Addition'),
-        ('=A1-B1', 'Subtraction'),
-        ('=A1*B1', 'Multiplication'),
-        ('=A1/B1', 'Division'),
-        ('=A1=B1', 'Equality'),
-        ('=A1<>B1', 'Not equal'),
-        ('=A1>B1', 'Greater than'),
-        ('=A1<B1', 'Less than'),
-        ('=A1>=B1', 'Greater equal'),
-        ('=A1<=B1', 'Less equal'),
-        ('=A1&B1', 'Concatenation')
-    ]
-    
     print("Testing operator preservation...")
     print()
     
-    js_formatter = ModularExcelFormatter.create_javascript_formatter()
-    plain_formatter = ModularExcelFormatter.create_plain_formatter()
+    js_formatter = get_formatter('j')
+    plain_formatter = get_formatter('p')
     
-    js_results = []
-    plain_results = []
+    js_passed = plain_passed = 0
     
-    for formula, desc in test_cases:
+    for formula, desc in _operator_cases:
         # Test JavaScript translator
         js_folded = js_formatter.fold_formula(formula)
         js_unfolded = js_formatter.unfold_formula(js_folded)
         js_success = normalize_formula(formula) == normalize_formula(js_unfolded)
-        js_results.append(js_success)
+        js_passed += js_success
         
         # Test Plain translator
         plain_folded = plain_formatter.fold_formula(formula)
         plain_unfolded = plain_formatter.unfold_formula(plain_folded)
         plain_success = normalize_formula(formula) == normalize_formula(plain_unfolded)
-        plain_results.append(plain_success)
+        plain_passed += plain_success
         
         print(f"{desc:15} | JS: {'✓' if js_success else '✗'} | Plain: {'✓' if plain_success else '✗'} | {formula}")
     
     print()
-    js_passed = sum(js_results)
-    plain_passed = sum(plain_results)
-    total = len(test_cases)
+    total = len(_operator_cases)
     
     print(f"JavaScript: {js_passed}/{total} operators preserved")
     print(f"Plain: {plain_passed}/{total} operators preserved")
@@ -237,11 +232,11 @@ def test_safe_mode_switching():
     original = '=IF(AND(A1>0,B1<>""),SUM(A1:A10),MAX(B1:B10))'
     
     # Start with JavaScript mode
-    js_formatter = ModularExcelFormatter.create_javascript_formatter()
+    js_formatter = get_formatter('j')
     js_folded = js_formatter.fold_formula(original)
     
     print(f"Original: {original}")
-    print(f"JavaScript folded (preview): {js_folded.split(chr(10))[0]}...")
+    print(f"JavaScript folded (preview): {js_folded.partition(chr(10))[0]}...")
     
     # Detect current mode
     detected_mode = detect_current_mode(js_folded)
@@ -253,7 +248,7 @@ def test_safe_mode_switching():
     
     # Safe switch back to javascript with refold
     js_result = safe_mode_switch(plain_result, 'plain', 'javascript', should_refold=True)
-    print(f"After safe switch back to JS (folded): {len(js_result.split(chr(10)))} lines")
+    print(f"After safe switch back to JS (folded): {js_result.count(chr(10)) + 1} lines")
     
     # Final unfold to verify integrity
     final_result = js_formatter.unfold_formula(js_result)
@@ -277,7 +272,7 @@ def test_safe_mode_switching():
 
 def test_complex_nested_formula():
     """Test with the actual complex formula from paste.txt."""
-    formatter = ModularExcelFormatter.create_javascript_formatter()
+    formatter = get_formatter('j')
     # Simplified version of the complex formula
     original = '=LET(has_Date,LEN(A1)>0,has_Price,LEN(B1)>=1,IFS(AND(has_Date,NOT(has_Price)),A1+30,TRUE,""))'
     
@@ -285,7 +280,7 @@ def test_complex_nested_formula():
     unfolded = formatter.unfold_formula(folded)
     
     print(f"Original: {original}")
-    print(f"Folded lines: {len(folded.split(chr(10)))}")
+    print(f"Folded lines: {folded.count(chr(10)) + 1}")
     print(f"Unfolded: {unfolded}")
     print()
     
@@ -316,22 +311,20 @@ def main():
         ("Complex Nested Formula", test_complex_nested_formula)
     ]
     
-    results = []
+    passed = 0
     for test_name, test_func in tests:
         print(f"Running {test_name} test...")
         print("-" * 50)
         try:
             success = test_func()
-            results.append(success)
+            passed += success
             print(f"✓ {test_name}: {'PASS' if success else 'FAIL'}")
         except Exception as e:
             print(f"✗ {test_name}: ERROR - {e}")
-            results.append(False)
         print()
     
     # Final summary
-    passed = sum(results)
-    total = len(results)
+    total = len(tests)
     
     print("=" * 70)
     print(f"Round-trip Test Results: {passed}/{total} tests passed")
@@ -11,7 +11,38 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
+
+# AND/OR formulas, from ones that should stay inline to nested ones
+_and_or_cases = (
+    # Simple cases that should stay inline
+    '=AND(A1,B1)',
+    '=OR(flag1,flag2)',
+    
+    # Complex cases that should go multi-line
+    '=AND(A1>0,B1<10,C1<>"")',
+    '=AND(has_Paid_Date,NOT(has_Price),has_Invoice_Date)',
+    '=AND(NOT(has_Paid_Date),NOT(has_WBL_Date),NOT(has_Title_Date),has_Routing_ETA,is_End_of_Year_ETA)',
+    
+    # Nested cases
+    '=IF(AND(A1>0,B1<10),Result1,Result2)',
+)
+
+# Single-argument functions that should stay on one line
+_simple_cases = (
+    '=LEN(A1)',
+    '=SUM(A1:A10)',
+    '=NOT(flag)',
+    '=ABS(value)',
+    '=UPPER(text)',
+)
+
+# Logical functions nested inside each other
+_nested_cases = (
+    '=AND(OR(A1,B1),OR(C1,D1))',
+    '=IF(AND(A1>0,OR(B1,C1)),Result1,Result2)',
+    '=LET(x,A1,AND(x>0,NOT(ISERROR(B1)),SUM(C1:C10)>100))',
+)
 
 
 def test_and_or_functions():
@@ -19,23 +50,9 @@ def test_and_or_functions():
     print("Testing AND/OR Functions with Simplified Approach")
     print("=" * 55)
     
-    test_cases = [
-        # Simple cases that should stay inline
-        '=AND(A1,B1)',
-        '=OR(flag1,flag2)', 
-        
-        # Complex cases that should go multi-line
-        '=AND(A1>0,B1<10,C1<>"")',
-        '=AND(has_Paid_Date,NOT(has_Price),has_Invoice_Date)',
-        '=AND(NOT(has_Paid_Date),NOT(has_WBL_Date),NOT(has_Title_Date),has_Routing_ETA,is_End_of_Year_ETA)',
-        
-        # Nested cases
-        '=IF(AND(A1>0,B1<10),Result1,Result2)',
-    ]
-    
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
-    for i, test_case in enumerate(test_cases, 1):
+    for i, test_case in enumerate(_and_or_cases, 1):
         original_commas = test_case.count(',')
         
         print(f"\nTest {i}: {test_case}")
@@ -54,9 +71,10 @@ def test_and_or_functions():
                 print(f"  Result: {unfolded}")
             
             # Show folded structure for complex cases
-            if len(folded.split('\n')) > 3:
+            folded_lines = folded.split('\n')
+            if len(folded_lines) > 3:
                 print("  Folded structure:")
-                for j, line in enumerate(folded.split('\n'), 1):
+                for j, line in enumerate(folded_lines, 1):
                     if line.strip():
                         print(f"    {j:2d}: {line}")
                         
@@ -69,17 +87,9 @@ def test_simple_inline_functions():
     print(f"\n\nTesting Simple Functions (Should Stay Inline)")
     print("=" * 50)
     
-    simple_cases = [
-        '=LEN(A1)',
-        '=SUM(A1:A10)',
-        '=NOT(flag)',
-        '=ABS(value)',
-        '=UPPER(text)',
-    ]
+    formatter = get_formatter('p')
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
-    
-    for i, test_case in enumerate(simple_cases, 1):
+    for i, test_case in enumerate(_simple_cases, 1):
         try:
             folded = formatter.fold_formula(test_case)
             lines = [line for line in folded.split('\n') if line.strip()]
@@ -104,15 +114,9 @@ def test_recursive_nesting():
     print(f"\n\nTesting Recursive Nesting")
     print("=" * 30)
     
-    nested_cases = [
-        '=AND(OR(A1,B1),OR(C1,D1))',
-        '=IF(AND(A1>0,OR(B1,C1)),Result1,Result2)',
-        '=LET(x,A1,AND(x>0,NOT(ISERROR(B1)),SUM(C1:C10)>100))',
-    ]
-    
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     
-    for i, test_case in enumerate(nested_cases, 1):
+    for i, test_case in enumerate(_nested_cases, 1):
         original_commas = test_case.count(',')
         
         print(f"\nNested {i}: {test_case}")
@@ -130,9 +134,10 @@ def test_recursive_nesting():
             # Show indentation structure
             print("  Structure:")
             for j, line in enumerate(folded.split('\n'), 1):
-                if line.strip() and not line.strip().startswith('//'):
+                stripped = line.strip()  # Strip once per line
+                if stripped and not stripped.startswith('//'):
                     indent_level = (len(line) - len(line.lstrip())) // 4
-                    print(f"    {j:2d}: {'  ' * indent_level}→ {line.strip()}")
+                    print(f"    {j:2d}: {'  ' * indent_level}→ {stripped}")
                     
         except Exception as e:
             print(f"  ERROR: {e}")
@@ -146,7 +151,7 @@ def test_user_problematic_pattern():
     # The exact pattern from user's output that was losing commas
     problematic = '=AND(NOT(has_Paid_Date),NOT(has_WBL_Date),NOT(has_Title_Date),has_Routing_ETA,is_End_of_Year_ETA)'
     
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     original_commas = problematic.count(',')
     
     print(f"Pattern: {problematic}")
@@ -12,7 +12,14 @@ from pathlib import Path
 package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
-from excel_formula_formatter.modular_excel_formatter import ModularExcelFormatter
+from excel_formula_formatter.modular_excel_formatter import get_formatter
+
+# Mode codes checked by the spacing tests, with their display names
+_modes = (
+    ('j', 'JavaScript'),
+    ('a', 'Annotated Excel'),
+    ('p', 'Plain Excel'),
+)
 
 
 def test_spacing_in_modes():
@@ -22,17 +29,11 @@ def test_spacing_in_modes():
     print(f"Original formula: {original}")
     print("=" * 50)
     
-    modes = {
-        'j': 'JavaScript',
-        'a': 'Annotated Excel', 
-        'p': 'Plain Excel'
-    }
-    
-    for mode_code, mode_name in modes.items():
+    for mode_code, mode_name in _modes:
         print(f"\n{mode_name} Mode ({mode_code}):")
         print("-" * 30)
         
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode_code)
+        formatter = get_formatter(mode_code)
         
         # Fold then unfold
         folded = formatter.fold_formula(original)
@@ -69,8 +70,8 @@ def test_complex_formula_spacing():
     print(f"\nComplex formula test: {original}")
     print("=" * 60)
     
-    for mode_code in ['j', 'a', 'p']:
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode_code)
+    for mode_code, _ in _modes:
+        formatter = get_formatter(mode_code)
         
         folded = formatter.fold_formula(original)
         unfolded = formatter.unfold_formula(folded)
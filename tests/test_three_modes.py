@@ -13,21 +13,18 @@ package_parent = Path(__file__).parent.parent
 sys.path.insert(0, str(package_parent))
 
 from excel_formula_formatter.modular_excel_formatter import (
-    ModularExcelFormatter, detect_current_mode, safe_mode_switch
+    get_formatter, detect_current_mode, safe_mode_switch
 )
 
 
 def normalize_formula(formula: str) -> str:
     """Normalize Excel formula for comparison by removing leading = and spaces."""
-    normalized = formula.strip()
-    if normalized.startswith('='):
-        normalized = normalized[1:]
-    return normalized.replace(' ', '')
+    return formula.strip().removeprefix('=').replace(' ', '')
 
 
 def test_javascript_mode():
     """Test JavaScript mode (j) - should have comments and quoted cell references."""
-    formatter = ModularExcelFormatter.create_formatter_by_mode('j')
+    formatter = get_formatter('j')
     original = '=IF(A1<>B1,SUM(A1:A10),"Equal")'
     
     folded = formatter.fold_formula(original)
@@ -61,7 +58,7 @@ def test_javascript_mode():
 
 def test_annotated_excel_mode():
     """Test Annotated Excel mode (a) - should have comments but no quoted cells."""
-    formatter = ModularExcelFormatter.create_formatter_by_mode('a')
+    formatter = get_formatter('a')
     original = '=IF(A1<>B1,SUM(A1:A10),"Equal")'
     
     folded = formatter.fold_formula(original)
@@ -95,7 +92,7 @@ def test_annotated_excel_mode():
 
 def test_plain_excel_mode():
     """Test Plain Excel mode (p) - should have NO comments, just pure Excel with indenting."""
-    formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    formatter = get_formatter('p')
     original = '=IF(A1<>B1,SUM(A1:A10),"Equal")'
     
     folded = formatter.fold_formula(original)
@@ -111,7 +108,7 @@ def test_plain_excel_mode():
     has_unquoted_cells = 'A1' in folded and '"A1"' not in folded
     has_excel_operator = '<>' in folded
     has_spacing = '( ' in folded and ' )' in folded  # Should have spacing around parentheses
-    has_indentation = any(line.startswith('    ') for line in folded.split('\n'))
+    has_indentation = folded.startswith('    ') or '\n    ' in folded  # Any line indented
     
     # Check round-trip
     round_trip_success = normalize_formula(original) == normalize_formula(unfolded)
@@ -132,17 +129,17 @@ def test_plain_excel_mode():
 def test_mode_detection():
     """Test automatic mode detection from text content."""
     # Test JavaScript mode detection
-    js_formatter = ModularExcelFormatter.create_formatter_by_mode('j')
+    js_formatter = get_formatter('j')
     js_folded = js_formatter.fold_formula('=SUM(A1:A10)')
     js_detected = detect_current_mode(js_folded)
     
     # Test Annotated Excel mode detection
-    annotated_formatter = ModularExcelFormatter.create_formatter_by_mode('a')
+    annotated_formatter = get_formatter('a')
     annotated_folded = annotated_formatter.fold_formula('=SUM(A1:A10)')
     annotated_detected = detect_current_mode(annotated_folded)
     
     # Test Plain Excel mode detection
-    plain_formatter = ModularExcelFormatter.create_formatter_by_mode('p')
+    plain_formatter = get_formatter('p')
     plain_folded = plain_formatter.fold_formula('=SUM(A1:A10)')
     plain_detected = detect_current_mode(plain_folded)
     
@@ -177,24 +174,24 @@ def test_safe_mode_switching():
     print(f"Original formula: {original}")
     
     # Start with JavaScript mode
-    js_formatter = ModularExcelFormatter.create_formatter_by_mode('j')
+    js_formatter = get_formatter('j')
     js_folded = js_formatter.fold_formula(original)
-    print(f"JavaScript folded: {len(js_folded.split(chr(10)))} lines")
+    print(f"JavaScript folded: {js_folded.count(chr(10)) + 1} lines")
     
     # Safe switch from JavaScript to Annotated
     annotated_result = safe_mode_switch(js_folded, 'j', 'a', should_refold=True)
-    print(f"Safe switch to Annotated: {len(annotated_result.split(chr(10)))} lines")
+    print(f"Safe switch to Annotated: {annotated_result.count(chr(10)) + 1} lines")
     
     # Safe switch from Annotated to Plain
     plain_result = safe_mode_switch(annotated_result, 'a', 'p', should_refold=True)
-    print(f"Safe switch to Plain: {len(plain_result.split(chr(10)))} lines")
+    print(f"Safe switch to Plain: {plain_result.count(chr(10)) + 1} lines")
     
     # Safe switch from Plain back to JavaScript
     js_result = safe_mode_switch(plain_result, 'p', 'j', should_refold=True)
-    print(f"Safe switch back to JavaScript: {len(js_result.split(chr(10)))} lines")
+    print(f"Safe switch back to JavaScript: {js_result.count(chr(10)) + 1} lines")
     
     # Final unfold to verify integrity
-    final_formatter = ModularExcelFormatter.create_formatter_by_mode('j')
+    final_formatter = get_formatter('j')
     final_unfolded = final_formatter.unfold_formula(js_result)
     print(f"Final unfolded: {final_unfolded}")
     print()
@@ -230,18 +227,19 @@ def test_complex_formula_all_modes():
     
     mode_results = {}
     mode_success = {}
+    original_norm = normalize_formula(original)  # Same for every mode
     
     for mode in ['j', 'a', 'p']:
-        formatter = ModularExcelFormatter.create_formatter_by_mode(mode)
+        formatter = get_formatter(mode)
         
         folded = formatter.fold_formula(original)
         unfolded = formatter.unfold_formula(folded)
         
         # Check round-trip
-        round_trip_success = normalize_formula(original) == normalize_formula(unfolded)
+        round_trip_success = original_norm == normalize_formula(unfolded)
         
         mode_results[mode] = {
-            'folded_lines': len(folded.split('\n')),
+            'folded_lines': folded.count(chr(10)) + 1,
             'has_comments': '//' in folded,
             'has_quotes': '"A1"' in folded or '"B1"' in folded,
             'round_trip': round_trip_success